@@ -1,17 +1,44 @@
 # Data Connection Module
 # Handles all Supabase queries for analysis
 
+import hashlib
 import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, wraps
+from typing import Optional
+
+import httpx
+import orjson
 import pandas as pd
-from supabase import create_client
+from supabase import Client, ClientOptions, create_client
 from config import get_secret
 
+# One shared client per process: every query reuses the same keep-alive pool
+# instead of paying a fresh TLS handshake per call.
+_CLIENT: Optional[Client] = None
+_CLIENT_LOCK = threading.Lock()
+_HTTP_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10)
+
+# Whole-table reads are also kept on disk briefly, so back-to-back CLI runs
+# (e.g. one phase per invocation) don't each re-download the same tables.
+TABLE_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "cache", "supabase"
+)
+TABLE_CACHE_TTL_SECONDS = 15 * 60
+
+# Business-context columns get_analysis_data joins from category_table
+CATEGORY_CONTEXT_COLUMNS = ("ticker", "date", "sector", "category", "risk_level")
+
+
 def _is_truthy(value: str) -> bool:
     return str(value).strip().lower() in {"1", "true", "yes", "on"}
 
-def get_supabase_client():
-    """Initialize and return Supabase client"""
 
+def _resolve_credentials():
+    """Return (url, key) honouring SUPABASE_USE_SERVICE_ROLE."""
     url = get_secret("SUPABASE_URL")
 
     anon_key = get_secret("SUPABASE_KEY")
@@ -37,8 +64,40 @@ def get_supabase_client():
             "SUPABASE_URL and SUPABASE_KEY are not configured"
         )
 
-    client = create_client(url, key)
+    return url, key
+
+
+class _OrjsonResponse(httpx.Response):
+    """httpx response whose .json() decodes with orjson."""
+
+    def json(self, **kwargs):
+        if kwargs:
+            return super().json(**kwargs)
+        return orjson.loads(self.content)
+
+
+class _OrjsonClient(httpx.Client):
+    """httpx client that hands postgrest orjson-decoding responses."""
 
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        response.__class__ = _OrjsonResponse
+        return response
+
+
+def _create_pooled_client(url, key) -> Client:
+    """Build a client backed by a keep-alive httpx connection pool."""
+    try:
+        options = ClientOptions(
+            httpx_client=_OrjsonClient(limits=_HTTP_LIMITS)
+        )
+    except TypeError:
+        # Older supabase-py releases do not accept a custom httpx client.
+        return create_client(url, key)
+    return create_client(url, key, options=options)
+
+
+def _get_streamlit_session():
     try:
         import streamlit as st
 
@@ -46,32 +105,149 @@ def get_supabase_client():
             "session" in st.session_state
             and st.session_state["session"]
         ):
-            session = st.session_state["session"]
+            return st, st.session_state["session"]
+    except Exception:
+        pass
+    return None, None
 
-            client.auth.set_session(
-                session.access_token,
-                session.refresh_token
-            )
 
-    except Exception:
+def get_supabase_client():
+    """
+    Return the shared Supabase client.
+
+    CLI/pipeline callers get a process-wide singleton. Logged-in Streamlit
+    users get a client cached in their own session_state so auth tokens are
+    never shared between sessions.
+    """
+    global _CLIENT
+
+    st, session = _get_streamlit_session()
+    if session is not None:
+        client = st.session_state.get("_supabase_client")
+        if client is None:
+            client = _create_pooled_client(*_resolve_credentials())
+            st.session_state["_supabase_client"] = client
+        if st.session_state.get("_supabase_client_token") != session.access_token:
+            try:
+                client.auth.set_session(
+                    session.access_token,
+                    session.refresh_token
+                )
+                st.session_state["_supabase_client_token"] = session.access_token
+            except Exception:
+                pass
+        return client
+
+    if _CLIENT is None:
+        with _CLIENT_LOCK:
+            if _CLIENT is None:
+                _CLIENT = _create_pooled_client(*_resolve_credentials())
+
+    return _CLIENT
+
+
+def _finalize_table(df):
+    """Parse ISO dates and order rows by (ticker, date)."""
+    if "date" in df.columns:
+        # Supabase and the staged CSVs both emit ISO 8601 dates; naming the
+        # format skips pandas' per-element format inference.
+        df["date"] = pd.to_datetime(df["date"], format="ISO8601", errors="coerce")
+    if "ticker" in df.columns and "date" in df.columns:
+        df = df.sort_values(["ticker", "date"]).reset_index(drop=True)
+    return df
+
+
+def sorted_by_ticker_date(df):
+    """
+    Return df ordered by (ticker, date).
+    
+    Tables from get_table_data are already in this order, so the O(N) check
+    lets analysis code skip the O(N log N) re-sort; other frames are sorted.
+    """
+    keys = pd.MultiIndex.from_arrays([df["ticker"], df["date"]])
+    if keys.is_monotonic_increasing:
+        return df
+    return df.sort_values(["ticker", "date"])
+
+
+def _read_staged_csv(path, columns=None):
+    """
+    Read a staged CSV, preferring its Parquet sidecar from the ETL when that
+    is at least as new; otherwise use the multithreaded pyarrow CSV parser.
+    A missing or stale sidecar is rewritten from that parse, so the CSV is
+    only parsed once per change.
+    """
+    usecols = list(columns) if columns else None
+    parquet_path = os.path.splitext(path)[0] + ".parquet"
+    try:
+        if os.path.getmtime(parquet_path) >= os.path.getmtime(path):
+            return pd.read_parquet(parquet_path, columns=usecols)
+    except (OSError, ImportError):
         pass
+    try:
+        df = pd.read_csv(path, engine="pyarrow")
+    except ImportError:
+        return pd.read_csv(path, usecols=usecols)
+    try:
+        tmp_path = f"{parquet_path}.tmp"
+        df.to_parquet(tmp_path, index=False, compression="zstd")
+        os.replace(tmp_path, parquet_path)
+    except Exception:
+        pass  # Read-only checkout etc.; the CSV read still stands
+    return df[usecols] if usecols else df
 
-    return client
 
+def _table_cache_path(table_name, columns):
+    selection = "all" if not columns else hashlib.md5(",".join(columns).encode()).hexdigest()[:12]
+    return os.path.join(TABLE_CACHE_DIR, f"{table_name}_{selection}.parquet")
+
+
+def _load_cached_table(path):
+    try:
+        if time.time() - os.path.getmtime(path) > TABLE_CACHE_TTL_SECONDS:
+            return None
+        return pd.read_parquet(path)
+    except Exception:
+        return None
+
+
+def _save_cached_table(path, df):
+    try:
+        os.makedirs(TABLE_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    except Exception:
+        pass  # The disk cache is an optimization only
+
+
+def get_table_data(table_name="standard_table", columns=None, ticker=None):
+    """
+    Fetch data from specified Supabase table.
+    columns limits the selected fields and ticker filters rows server-side,
+    so callers only pay for the payload they use. Whole-table reads outside a
+    Streamlit session are reused from disk for TABLE_CACHE_TTL_SECONDS.
+    """
+    cache_path = None
+    if ticker is None and _get_streamlit_session()[1] is None:
+        # Session reads are scoped to the user, so only these are shareable
+        cache_path = _table_cache_path(table_name, columns)
+        cached = _load_cached_table(cache_path)
+        if cached is not None:
+            return cached
 
-def get_table_data(table_name="standard_table"):
-    """Fetch data from specified Supabase table."""
     try:
         supabase = get_supabase_client()
-        response = supabase.table(table_name).select("*").execute()
+        query = supabase.table(table_name).select(",".join(columns) if columns else "*")
+        if ticker is not None:
+            query = query.eq("ticker", ticker)
+        response = query.execute()
         if not response.data:
             raise ValueError(f"No rows returned from Supabase table: {table_name}")
 
-        df = pd.DataFrame(response.data)
-        if "date" in df.columns:
-            df["date"] = pd.to_datetime(df["date"], errors="coerce")
-        if "ticker" in df.columns and "date" in df.columns:
-            df = df.sort_values(["ticker", "date"]).reset_index(drop=True)
+        df = _finalize_table(pd.DataFrame(response.data))
+        if cache_path is not None:
+            _save_cached_table(cache_path, df)
         return df
     except Exception as e:
         print(f"✗ Error loading {table_name} from Supabase: {e}")
@@ -82,48 +258,132 @@ def get_table_data(table_name="standard_table"):
         if not os.path.exists(local_path):
             raise
 
-        df = pd.read_csv(local_path)
-        if "date" in df.columns:
-            df["date"] = pd.to_datetime(df["date"], errors="coerce")
-        if "ticker" in df.columns and "date" in df.columns:
-            df = df.sort_values(["ticker", "date"]).reset_index(drop=True)
-        return df
+        df = _read_staged_csv(local_path, columns)
+        if ticker is not None:
+            df = df[df["ticker"] == ticker]
+        return _finalize_table(df)
 
 
-def get_standard_table_data():
-    """Fetch standard_table (ML features)."""
-    return get_table_data("standard_table")
+def _categorize_ticker(df):
+    """Store ticker as a category so filters/groupbys compare integer codes."""
+    if "ticker" in df.columns:
+        df["ticker"] = df["ticker"].astype("category")
+    return df
 
 
-def get_category_table_data():
-    """Fetch category_table (business context)."""
-    return get_table_data("category_table")
+def _memoize_outside_session(maxsize):
+    """
+    lru_cache that only applies when no Streamlit user is logged in. Session
+    reads are RLS-scoped to that user, so a process-wide cache would hand one
+    user's rows to every later session; those calls always re-fetch instead.
+    """
+    def decorator(func):
+        cached = lru_cache(maxsize=maxsize)(func)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _get_streamlit_session()[1] is not None:
+                return func(*args, **kwargs)
+            return cached(*args, **kwargs)
+
+        wrapper.cache_clear = cached.cache_clear
+        wrapper.cache_info = cached.cache_info
+        return wrapper
+
+    return decorator
+
+
+@_memoize_outside_session(maxsize=4)
+def get_standard_table_data(columns=None):
+    """
+    Fetch standard_table (ML features). Cached per process outside a logged-in
+    session; treat as read-only.
+    columns is an optional tuple of fields to select (default: all).
+    Rows are ordered by (ticker, date).
+    """
+    return _categorize_ticker(get_table_data("standard_table", columns))
 
 
+@_memoize_outside_session(maxsize=4)
+def get_category_table_data(columns=None):
+    """
+    Fetch category_table (business context). Cached per process outside a
+    logged-in session; treat as read-only.
+    columns is an optional tuple of fields to select (default: all).
+    """
+    return _categorize_ticker(get_table_data("category_table", columns))
+
+
+@_memoize_outside_session(maxsize=1)
 def get_analysis_data():
     """
     Fetch both tables and merge for comprehensive analysis.
+    Cached per process outside a logged-in session, so a full analysis run
+    hits Supabase once per table.
     Returns:
         Tuple of (standard_df, category_df, merged_df)
     """
     print("\n--- Loading Data from Supabase ---")
-    standard_df = get_standard_table_data()
-    category_df = get_category_table_data()
-
-    merged_df = standard_df.merge(
-        category_df[["ticker", "date", "sector", "category", "risk_level"]],
-        on=["ticker", "date"],
-        how="left",
+    _, session = _get_streamlit_session()
+    if session is None:
+        # The two tables are independent round trips; overlap them.
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            standard_future = pool.submit(get_standard_table_data)
+            category_future = pool.submit(get_category_table_data, CATEGORY_CONTEXT_COLUMNS)
+            standard_df = standard_future.result()
+            category_df = category_future.result()
+    else:
+        # A session's client lives in session_state, which worker threads can't see
+        standard_df = get_standard_table_data()
+        category_df = get_category_table_data(CATEGORY_CONTEXT_COLUMNS)
+
+    # Left-join the business context by (ticker, date) via an index lookup
+    # instead of a hash merge; the keys are unique per table.
+    context_cols = list(CATEGORY_CONTEXT_COLUMNS[2:])
+    tickers = pd.api.types.union_categoricals(
+        [standard_df["ticker"], category_df["ticker"]], ignore_order=True
+    ).categories
+    context = category_df[["ticker", "date", *context_cols]].assign(
+        ticker=category_df["ticker"].cat.set_categories(tickers)
+    ).set_index(["ticker", "date"])
+    if not context.index.is_unique:
+        dupes = int(context.index.duplicated().sum())
+        print(f"⚠ category_table has {dupes} duplicate (ticker, date) rows; keeping the latest")
+        context = context[~context.index.duplicated(keep="last")]
+
+    keys = pd.MultiIndex.from_arrays(
+        [standard_df["ticker"].cat.set_categories(tickers), standard_df["date"]],
+        names=["ticker", "date"],
     )
+    aligned = context.reindex(keys)
+
+    merged_df = standard_df.copy()
+    for col in context_cols:
+        merged_df[col] = aligned[col].to_numpy()
     print(f"✓ Merged datasets: {len(merged_df)} records\n")
     return standard_df, category_df, merged_df
 
 
+def invalidate_cache():
+    """Drop memoized table data (in memory and on disk) so the next call re-fetches from Supabase."""
+    get_standard_table_data.cache_clear()
+    get_category_table_data.cache_clear()
+    get_analysis_data.cache_clear()
+    shutil.rmtree(TABLE_CACHE_DIR, ignore_errors=True)
+
+
 def get_company_data(ticker):
     """Fetch data for a specific company."""
     try:
-        standard_df, category_df, _ = get_analysis_data()
-        company_data = standard_df[standard_df["ticker"] == ticker].copy()
+        if _get_streamlit_session()[1] is None and get_standard_table_data.cache_info().currsize:
+            # Full table already in memory: slice it instead of another round-trip.
+            # Never inside a session: the shared cache isn't scoped to that user.
+            standard_df = get_standard_table_data()
+            company_data = standard_df[standard_df["ticker"] == ticker].copy()
+        else:
+            company_data = _categorize_ticker(
+                get_table_data("standard_table", ticker=ticker)
+            )
         if len(company_data) == 0:
             raise ValueError(f"No data found for ticker: {ticker}")
         print(f"✓ Loaded {len(company_data)} records for {ticker}\n")
@@ -136,7 +396,7 @@ def get_company_data(ticker):
 def get_companies_list():
     """Get list of unique companies in dataset."""
     try:
-        standard_df, _, _ = get_analysis_data()
+        standard_df = get_standard_table_data()
         companies = sorted(standard_df["ticker"].unique().tolist())
         print(f"✓ Found {len(companies)} companies: {', '.join(companies)}\n")
         return companies
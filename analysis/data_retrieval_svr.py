@@ -76,12 +76,12 @@ def _coerce_date_series(series: pd.Series) -> pd.Series:
 
     q1_mask = q1[0].notna() & q1[1].notna() & out.isna()
     if q1_mask.any():
-        q_dates = q1.loc[q1_mask].apply(lambda r: f"{r[0]}-{quarter_map.get(r[1], '12-31')}", axis=1)
+        q_dates = q1.loc[q1_mask, 0] + "-" + q1.loc[q1_mask, 1].map(quarter_map)
         out.loc[q1_mask] = pd.to_datetime(q_dates, errors="coerce")
 
     q2_mask = q2[0].notna() & q2[1].notna() & out.isna()
     if q2_mask.any():
-        q_dates = q2.loc[q2_mask].apply(lambda r: f"{r[1]}-{quarter_map.get(r[0], '12-31')}", axis=1)
+        q_dates = q2.loc[q2_mask, 1] + "-" + q2.loc[q2_mask, 0].map(quarter_map)
         out.loc[q2_mask] = pd.to_datetime(q_dates, errors="coerce")
 
     # Year-only: 2024 -> 2024-12-31
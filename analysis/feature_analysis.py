@@ -6,13 +6,76 @@ Calculates feature correlations, importance, and redundancy analysis
 import pandas as pd
 import numpy as np
 from sklearn.preprocessing import StandardScaler
-from sklearn.ensemble import RandomForestRegressor
+from sklearn.ensemble import HistGradientBoostingRegressor
+from sklearn.inspection import permutation_importance
 import warnings
 warnings.filterwarnings('ignore')
 
 from .data_connection import get_analysis_data
 
 
+def _pairs_above(corr_matrix, threshold):
+    """
+    Return upper-triangle feature pairs whose |correlation| exceeds threshold.
+    
+    Args:
+        corr_matrix: Square correlation matrix
+        threshold: Absolute correlation cut-off
+        
+    Returns:
+        List of dicts with feature_1, feature_2 and correlation
+    """
+    arr = corr_matrix.to_numpy()
+    columns = corr_matrix.columns.to_numpy()
+    i_idx, j_idx = np.triu_indices(arr.shape[0], k=1)
+    vals = arr[i_idx, j_idx]
+    mask = np.abs(vals) > threshold
+    
+    return [
+        {'feature_1': columns[i], 'feature_2': columns[j], 'correlation': val}
+        for i, j, val in zip(i_idx[mask], j_idx[mask], vals[mask])
+    ]
+
+
+def _correlation_matrix(df):
+    """
+    Pearson correlation over pairwise-complete observations via matrix products.
+    
+    Equivalent to DataFrame.corr(), but the pairwise sums are computed with
+    BLAS matmuls on a mask-zeroed buffer instead of a per-pair loop.
+    
+    Args:
+        df: DataFrame of numerical columns
+        
+    Returns:
+        Square correlation DataFrame
+    """
+    X = df.to_numpy(dtype=np.float64)
+    mask = np.isfinite(X)
+    
+    # Centre and scale each column first so the sums below stay well conditioned
+    with np.errstate(invalid='ignore', divide='ignore'):
+        centre = np.nanmean(np.where(mask, X, np.nan), axis=0)
+        scale = np.nanstd(np.where(mask, X, np.nan), axis=0)
+    scale[~(scale > 0)] = 1.0
+    Z = np.where(mask, (X - np.nan_to_num(centre)) / scale, 0.0)
+    M = mask.astype(np.float64)
+    
+    n = M.T @ M
+    sum_x = Z.T @ M
+    sum_xx = (Z * Z).T @ M
+    sum_xy = Z.T @ Z
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = sum_xy - sum_x * sum_x.T / n
+        var_x = sum_xx - sum_x ** 2 / n
+        corr = cov / np.sqrt(var_x * var_x.T)
+    corr[(n < 2) | ~(var_x > 0) | ~(var_x.T > 0)] = np.nan
+    np.clip(corr, -1.0, 1.0, out=corr)
+    
+    return pd.DataFrame(corr, index=df.columns, columns=df.columns)
+
+
 def calculate_correlations(df):
     """
     Calculate correlation matrix between all numerical features.
@@ -27,18 +90,10 @@ def calculate_correlations(df):
     numerical_cols = df.select_dtypes(include=[np.number]).columns
     
     # Calculate correlation matrix
-    corr_matrix = df[numerical_cols].corr()
+    corr_matrix = _correlation_matrix(df[numerical_cols])
     
     # Find high correlations (excluding diagonal)
-    high_corr_pairs = []
-    for i in range(len(corr_matrix.columns)):
-        for j in range(i+1, len(corr_matrix.columns)):
-            if abs(corr_matrix.iloc[i, j]) > 0.7:  # Threshold: 0.7
-                high_corr_pairs.append({
-                    'feature_1': corr_matrix.columns[i],
-                    'feature_2': corr_matrix.columns[j],
-                    'correlation': corr_matrix.iloc[i, j]
-                })
+    high_corr_pairs = _pairs_above(corr_matrix, 0.7)  # Threshold: 0.7
     
     return {
         'correlation_matrix': corr_matrix,
@@ -48,7 +103,7 @@ def calculate_correlations(df):
 
 def calculate_feature_importance(df, target_col='net_profit'):
     """
-    Calculate feature importance using Random Forest regression.
+    Calculate feature importance using gradient boosting and permutation importance.
     
     Args:
         df: DataFrame with features
@@ -71,25 +126,35 @@ def calculate_feature_importance(df, target_col='net_profit'):
     X = df[feature_cols].fillna(0)
     y = df[target_col].fillna(0)
     
-    # Train Random Forest
-    rf_model = RandomForestRegressor(n_estimators=100, random_state=42, max_depth=10)
-    rf_model.fit(X, y)
+    # Train histogram-based gradient boosting (much cheaper to fit than a deep forest).
+    # The default 20-row leaves can't split frames under 40 rows (small user
+    # uploads), so leaves shrink with the data; from 200 rows up it's the default.
+    min_samples_leaf = max(1, min(20, len(X) // 10))
+    model = HistGradientBoostingRegressor(
+        max_iter=50, max_depth=6, min_samples_leaf=min_samples_leaf, random_state=42
+    )
+    model.fit(X, y)
     
-    # Get importance scores
+    # Get importance scores; negative permutation scores mean "no signal"
+    permutation = permutation_importance(model, X, y, n_repeats=5, random_state=42)
     importance_scores = pd.DataFrame({
         'feature': feature_cols,
-        'importance': rf_model.feature_importances_
+        'importance': np.clip(permutation.importances_mean, 0, None)
     }).sort_values('importance', ascending=False)
     
-    # Calculate cumulative importance
+    # Calculate cumulative importance; with no signal at all every share is 0%, not 0/0
     importance_scores['cumulative_importance'] = importance_scores['importance'].cumsum()
-    importance_scores['cumulative_importance_pct'] = (
-        importance_scores['cumulative_importance'] / importance_scores['importance'].sum() * 100
-    )
+    total_importance = importance_scores['importance'].sum()
+    if total_importance > 0:
+        importance_scores['cumulative_importance_pct'] = (
+            importance_scores['cumulative_importance'] / total_importance * 100
+        )
+    else:
+        importance_scores['cumulative_importance_pct'] = 0.0
     
     return {
         'feature_importance': importance_scores,
-        'model': rf_model,
+        'model': model,
         'target_column': target_col
     }
 
@@ -105,16 +170,11 @@ def identify_redundant_features(corr_matrix, threshold=0.8):
     Returns:
         List of redundant feature pairs
     """
-    redundant_pairs = []
-    for i in range(len(corr_matrix.columns)):
-        for j in range(i+1, len(corr_matrix.columns)):
-            if abs(corr_matrix.iloc[i, j]) > threshold:
-                redundant_pairs.append({
-                    'feature_1': corr_matrix.columns[i],
-                    'feature_2': corr_matrix.columns[j],
-                    'correlation': corr_matrix.iloc[i, j],
-                    'recommendation': f"Consider removing {corr_matrix.columns[j]} (highly correlated with {corr_matrix.columns[i]})"
-                })
+    redundant_pairs = _pairs_above(corr_matrix, threshold)
+    for pair in redundant_pairs:
+        pair['recommendation'] = (
+            f"Consider removing {pair['feature_2']} (highly correlated with {pair['feature_1']})"
+        )
     return redundant_pairs
 
 
@@ -130,22 +190,29 @@ def analyze_feature_variance(df):
     """
     numerical_cols = df.select_dtypes(include=[np.number]).columns
     
+    # One dispatch over the numeric block instead of a separate reduction per statistic
+    stats = df[numerical_cols].agg(['mean', 'std', 'min', 'max']).T
+    
     variance_stats = pd.DataFrame({
         'feature': numerical_cols,
-        'mean': df[numerical_cols].mean(),
-        'std_dev': df[numerical_cols].std(),
-        'min': df[numerical_cols].min(),
-        'max': df[numerical_cols].max(),
-        'coefficient_of_variation': (df[numerical_cols].std() / df[numerical_cols].mean().abs()).replace([np.inf, -np.inf], 0)
+        'mean': stats['mean'],
+        'std_dev': stats['std'],
+        'min': stats['min'],
+        'max': stats['max'],
+        'coefficient_of_variation': (stats['std'] / stats['mean'].abs()).replace([np.inf, -np.inf], 0)
     }).sort_values('std_dev', ascending=False)
     
     return variance_stats
 
 
-def run_feature_analysis():
+def run_feature_analysis(data=None):
     """
     Execute complete feature analysis.
     
+    Args:
+        data: (standard_df, category_df, merged_df) from get_analysis_data();
+            fetched when omitted, so callers can share one load
+        
     Returns:
         dict with all analysis results
     """
@@ -156,7 +223,7 @@ def run_feature_analysis():
     # Load data
     print("\n[1/5] Loading data from Supabase...")
     try:
-        _, _, df = get_analysis_data()  # Unpack tuple (standard_df, category_df, merged_df)
+        _, _, df = data if data is not None else get_analysis_data()
         print(f"✓ Data loaded: {len(df)} records")
     except Exception as e:
         print(f"✗ Error loading data: {e}")
@@ -181,8 +248,8 @@ def run_feature_analysis():
         importance_results = calculate_feature_importance(df)
         print(f"✓ Feature importance calculated")
         print(f"✓ Top 5 important features:")
-        for idx, row in importance_results['feature_importance'].head(5).iterrows():
-            print(f"  - {row['feature']}: {row['importance']:.4f} ({row['cumulative_importance_pct']:.1f}% cumulative)")
+        for row in importance_results['feature_importance'].head(5).itertuples(index=False):
+            print(f"  - {row.feature}: {row.importance:.4f} ({row.cumulative_importance_pct:.1f}% cumulative)")
     except Exception as e:
         print(f"✗ Error: {e}")
         importance_results = None
@@ -207,8 +274,8 @@ def run_feature_analysis():
         variance_stats = analyze_feature_variance(df)
         print(f"✓ Variance analysis complete")
         print(f"✓ Top 5 highest variance features:")
-        for idx, row in variance_stats.head(5).iterrows():
-            print(f"  - {row['feature']}: σ={row['std_dev']:.4f}, CV={row['coefficient_of_variation']:.4f}")
+        for row in variance_stats.head(5).itertuples(index=False):
+            print(f"  - {row.feature}: σ={row.std_dev:.4f}, CV={row.coefficient_of_variation:.4f}")
     except Exception as e:
         print(f"✗ Error: {e}")
         variance_stats = None
@@ -12,7 +12,7 @@ warnings.filterwarnings('ignore')
 from .data_connection import get_analysis_data
 
 
-def scale_features(df, method='standard', exclude_cols=None):
+def scale_features(df, method='standard', exclude_cols=None, inplace=False):
     """
     Scale numerical features using specified method.
     
@@ -20,6 +20,7 @@ def scale_features(df, method='standard', exclude_cols=None):
         df: DataFrame with features to scale
         method: 'standard' (z-score), 'minmax', or 'robust'
         exclude_cols: List of column names to exclude from scaling
+        inplace: Scale df itself instead of a copy
         
     Returns:
         tuple: (scaled_df, scaler_object)
@@ -27,7 +28,7 @@ def scale_features(df, method='standard', exclude_cols=None):
     if exclude_cols is None:
         exclude_cols = []
     
-    df_copy = df.copy()
+    df_copy = df if inplace else df.copy()
     
     # Select numerical columns to scale
     numerical_cols = df.select_dtypes(include=[np.number]).columns
@@ -49,18 +50,30 @@ def scale_features(df, method='standard', exclude_cols=None):
     return df_copy, scaler
 
 
-def handle_missing_values(df, method='mean'):
+def _fill_with_modes(df, cols):
+    """Fill gaps in cols with each column's mode ('Unknown' if it has none)."""
+    missing = [c for c in cols if df[c].isna().any()]
+    if not missing:
+        return
+    modes = df[missing].mode(dropna=True)
+    fill = modes.iloc[0] if not modes.empty else pd.Series(index=missing, dtype=object)
+    df[missing] = df[missing].fillna(fill.fillna('Unknown'))
+
+
+def handle_missing_values(df, method='mean', inplace=False):
     """
     Handle missing values in the dataset.
     
     Args:
         df: DataFrame with potential missing values
         method: 'mean', 'median', 'forward_fill', or 'drop'
+        inplace: Fill df itself instead of a copy ('forward_fill' and
+            'drop' always return a new frame)
         
     Returns:
         DataFrame with missing values handled
     """
-    df_copy = df.copy()
+    df_copy = df if inplace else df.copy()
     
     numeric_cols = df_copy.select_dtypes(include=[np.number]).columns.tolist()
     categorical_cols = [c for c in df_copy.columns if c not in numeric_cols]
@@ -68,17 +81,11 @@ def handle_missing_values(df, method='mean'):
     if method == 'mean':
         if numeric_cols:
             df_copy[numeric_cols] = df_copy[numeric_cols].fillna(df_copy[numeric_cols].mean(numeric_only=True))
-        for col in categorical_cols:
-            if df_copy[col].isna().any():
-                mode = df_copy[col].mode(dropna=True)
-                df_copy[col] = df_copy[col].fillna(mode.iloc[0] if not mode.empty else 'Unknown')
+        _fill_with_modes(df_copy, categorical_cols)
     elif method == 'median':
         if numeric_cols:
             df_copy[numeric_cols] = df_copy[numeric_cols].fillna(df_copy[numeric_cols].median(numeric_only=True))
-        for col in categorical_cols:
-            if df_copy[col].isna().any():
-                mode = df_copy[col].mode(dropna=True)
-                df_copy[col] = df_copy[col].fillna(mode.iloc[0] if not mode.empty else 'Unknown')
+        _fill_with_modes(df_copy, categorical_cols)
     elif method == 'forward_fill':
         df_copy = df_copy.fillna(method='ffill').fillna(method='bfill')
     elif method == 'drop':
@@ -87,56 +94,65 @@ def handle_missing_values(df, method='mean'):
     return df_copy
 
 
-def remove_constant_features(df, threshold=0.0):
+def remove_constant_features(df, threshold=0.0, inplace=False):
     """
     Remove features with zero or near-zero variance.
     
     Args:
         df: DataFrame
         threshold: Variance threshold (0.0 = exact zero variance)
+        inplace: Drop the columns from df itself instead of a copy
         
     Returns:
         tuple: (df with constant features removed, list of removed columns)
     """
-    df_copy = df.copy()
-    removed_cols = []
+    numerical_cols = df.select_dtypes(include=[np.number]).columns
+    variances = df[numerical_cols].var().to_numpy()
     
-    for col in df.select_dtypes(include=[np.number]).columns:
-        variance = df_copy[col].var()
-        if variance <= threshold:
-            removed_cols.append(col)
-            df_copy = df_copy.drop(columns=[col])
+    # NaN variance (e.g. a single non-null row) is kept, as before
+    removed_cols = numerical_cols[variances <= threshold].tolist()
+    if inplace:
+        df.drop(columns=removed_cols, inplace=True)
+        df_copy = df
+    else:
+        df_copy = df.drop(columns=removed_cols)
     
     return df_copy, removed_cols
 
 
-def fix_infinite_values(df):
+def fix_infinite_values(df, inplace=False):
     """
     Replace infinite values with max/min finite values.
     
     Args:
         df: DataFrame potentially containing infinite values
+        inplace: Fix df itself instead of a copy
         
     Returns:
         DataFrame with infinite values fixed
     """
-    df_copy = df.copy()
+    df_copy = df if inplace else df.copy()
     
-    for col in df.select_dtypes(include=[np.number]).columns:
-        # Find infinite values
-        inf_mask = np.isinf(df_copy[col])
-        
-        if inf_mask.any():
-            # Get finite values
-            finite_values = df_copy[col][~inf_mask]
-            
-            if len(finite_values) > 0:
-                max_val = finite_values.max()
-                min_val = finite_values.min()
-                
-                # Replace positive inf with max, negative inf with min
-                df_copy[col] = df_copy[col].replace(np.inf, max_val)
-                df_copy[col] = df_copy[col].replace(-np.inf, min_val)
+    numerical_cols = df_copy.select_dtypes(include=[np.number]).columns
+    values = df_copy[numerical_cols].to_numpy(dtype=np.float64, na_value=np.nan)
+    pos_inf = values == np.inf
+    neg_inf = values == -np.inf
+    inf_mask = pos_inf | neg_inf
+    
+    # Only touch columns that contain infinities alongside other values
+    fix = inf_mask.any(axis=0) & ~inf_mask.all(axis=0)
+    if not fix.any():
+        return df_copy
+    
+    values = values[:, fix]
+    finite = np.where(inf_mask[:, fix], np.nan, values)
+    col_max = np.nanmax(finite, axis=0)
+    col_min = np.nanmin(finite, axis=0)
+    
+    # Replace positive inf with max, negative inf with min
+    values = np.where(pos_inf[:, fix], col_max, values)
+    values = np.where(neg_inf[:, fix], col_min, values)
+    df_copy[numerical_cols[fix]] = values
     
     return df_copy
 
@@ -147,22 +163,18 @@ def encode_categorical(df, categorical_cols=None):
     
     Args:
         df: DataFrame
-        categorical_cols: List of categorical column names (defaults to object dtype columns)
+        categorical_cols: List of categorical column names (defaults to object/category dtype columns)
         
     Returns:
         DataFrame with encoded categorical features
     """
-    df_copy = df.copy()
-    
     if categorical_cols is None:
-        categorical_cols = df.select_dtypes(include=['object']).columns.tolist()
+        categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
     
-    # Apply one-hot encoding
-    for col in categorical_cols:
-        if col in df_copy.columns:
-            dummies = pd.get_dummies(df_copy[col], prefix=col, drop_first=True)
-            df_copy = pd.concat([df_copy, dummies], axis=1)
-            df_copy = df_copy.drop(columns=[col])
+    # Apply one-hot encoding, concatenating all dummy blocks at once
+    encode_cols = [col for col in categorical_cols if col in df.columns]
+    dummies_list = [pd.get_dummies(df[col], prefix=col, drop_first=True) for col in encode_cols]
+    df_copy = pd.concat([df.drop(columns=encode_cols), *dummies_list], axis=1)
     
     return df_copy
 
@@ -179,12 +191,13 @@ def prepare_ml_dataset(df, scale_method='standard', handle_missing='mean'):
     Returns:
         dict with processed data and preprocessing steps
     """
+    # One working copy for the whole pipeline; every step below edits it in place
     df_processed = df.copy()
     preprocessing_log = []
     
     # Step 1: Fix infinite values
     initial_inf = np.isinf(df_processed.select_dtypes(include=[np.number])).sum().sum()
-    df_processed = fix_infinite_values(df_processed)
+    df_processed = fix_infinite_values(df_processed, inplace=True)
     preprocessing_log.append({
         'step': 'Fix infinite values',
         'infinite_values_fixed': initial_inf
@@ -192,7 +205,7 @@ def prepare_ml_dataset(df, scale_method='standard', handle_missing='mean'):
     
     # Step 2: Handle missing values
     initial_na = df_processed.isna().sum().sum()
-    df_processed = handle_missing_values(df_processed, method=handle_missing)
+    df_processed = handle_missing_values(df_processed, method=handle_missing, inplace=True)
     preprocessing_log.append({
         'step': 'Handle missing values',
         'missing_values_handled': initial_na,
@@ -200,7 +213,7 @@ def prepare_ml_dataset(df, scale_method='standard', handle_missing='mean'):
     })
     
     # Step 3: Encode categorical features
-    categorical_cols = df_processed.select_dtypes(include=['object']).columns.tolist()
+    categorical_cols = df_processed.select_dtypes(include=['object', 'category']).columns.tolist()
     if categorical_cols:
         df_processed = encode_categorical(df_processed, categorical_cols)
         preprocessing_log.append({
@@ -210,7 +223,7 @@ def prepare_ml_dataset(df, scale_method='standard', handle_missing='mean'):
     
     # Step 4: Remove constant features
     initial_cols = len(df_processed.columns)
-    df_processed, removed_cols = remove_constant_features(df_processed, threshold=0.0)
+    df_processed, removed_cols = remove_constant_features(df_processed, threshold=0.0, inplace=True)
     preprocessing_log.append({
         'step': 'Remove constant features',
         'constant_features_removed': len(removed_cols),
@@ -219,7 +232,9 @@ def prepare_ml_dataset(df, scale_method='standard', handle_missing='mean'):
     
     # Step 5: Scale features
     exclude_from_scaling = ['ticker', 'company', 'fiscal_year', 'category', 'growth_category']
-    df_processed, scaler = scale_features(df_processed, method=scale_method, exclude_cols=exclude_from_scaling)
+    df_processed, scaler = scale_features(
+        df_processed, method=scale_method, exclude_cols=exclude_from_scaling, inplace=True
+    )
     preprocessing_log.append({
         'step': 'Scale features',
         'method': scale_method,
@@ -236,10 +251,14 @@ def prepare_ml_dataset(df, scale_method='standard', handle_missing='mean'):
     }
 
 
-def run_feature_preprocessing():
+def run_feature_preprocessing(data=None):
     """
     Execute complete feature preprocessing pipeline.
     
+    Args:
+        data: (standard_df, category_df, merged_df) from get_analysis_data();
+            fetched when omitted, so callers can share one load
+        
     Returns:
         dict with preprocessing results
     """
@@ -250,7 +269,7 @@ def run_feature_preprocessing():
     # Load data
     print("\n[1/5] Loading raw data...")
     try:
-        _, _, df = get_analysis_data()  # Unpack tuple (standard_df, category_df, merged_df)
+        _, _, df = data if data is not None else get_analysis_data()
         print(f"✓ Data loaded: {df.shape[0]} rows × {df.shape[1]} columns")
     except Exception as e:
         print(f"✗ Error loading data: {e}")
@@ -275,7 +294,7 @@ def run_feature_preprocessing():
     
     print("\n[4/5] Encoding categorical features...")
     try:
-        categorical = df.select_dtypes(include=['object']).columns.tolist()
+        categorical = df.select_dtypes(include=['object', 'category']).columns.tolist()
         df = encode_categorical(df, categorical_cols=categorical)
         print(f"✓ Encoded {len(categorical)} categorical features: {', '.join(categorical)}")
     except Exception as e:
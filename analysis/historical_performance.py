@@ -3,7 +3,24 @@
 
 import pandas as pd
 import numpy as np
-from .data_connection import get_standard_table_data, get_company_data
+from numba import njit
+from .data_connection import get_standard_table_data, get_company_data, sorted_by_ticker_date
+
+
+@njit(cache=True)
+def _cagr_vec(start, end, n):
+    """Per-element CAGR as a fraction; NaN where an endpoint is non-positive."""
+    out = np.empty(start.shape[0])
+    for i in range(start.shape[0]):
+        if start[i] <= 0 or end[i] <= 0:
+            out[i] = np.nan
+        else:
+            out[i] = (end[i] / start[i]) ** (1.0 / n[i]) - 1.0
+    return out
+
+
+# Pay the JIT compile cost at import rather than on the first report
+_cagr_vec(np.ones(1), np.ones(1), np.ones(1))
 
 
 def analyze_historical_performance(ticker=None):
@@ -27,21 +44,105 @@ def analyze_historical_performance(ticker=None):
         df = get_standard_table_data()
         companies = sorted(df['ticker'].unique())
     
+    all_metrics = calculate_performance_table(df)
     performance_report = {}
     
     for company in companies:
-        company_data = df[df['ticker'] == company].sort_values('date')
-        
-        if len(company_data) == 0:
+        if company not in all_metrics:
             continue
         
-        performance = calculate_performance_metrics(company_data, company)
+        performance = all_metrics[company]
         performance_report[company] = performance
         print_performance_summary(company, performance)
     
     return performance_report
 
 
+# Numeric columns read by calculate_performance_table, in block order
+_METRIC_COLUMNS = ['revenue', 'net_income', 'profit_margin', 'operating_margin',
+                   'debt_to_asset', 'asset_efficiency', 'operating_cashflow']
+
+
+def calculate_performance_table(df):
+    """
+    Calculate performance metrics for every company in one grouped pass
+    
+    Args:
+        df: DataFrame with records for one or more tickers
+    
+    Returns:
+        Dictionary mapping ticker to its performance metrics
+    """
+    df = sorted_by_ticker_date(df[df['ticker'].notna()])
+    if df.empty:
+        return {}
+    
+    # Read the fixed metric schema into one float block and address columns
+    # by position; each ticker is a contiguous [start, end) row range.
+    values = df[list(_METRIC_COLUMNS)].to_numpy(dtype=np.float64)
+    keys = df['ticker'].to_numpy()
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(keys)]
+    tickers = pd.Index(keys[starts], name='ticker')
+    
+    # First/last rows keep NaN endpoints, matching positional first/last rows
+    firsts = pd.DataFrame(values[starts], index=tickers, columns=_METRIC_COLUMNS)
+    lasts = pd.DataFrame(values[ends - 1], index=tickers, columns=_METRIC_COLUMNS)
+    
+    present = ~np.isnan(values)
+    sums = np.add.reduceat(np.where(present, values, 0.0), starts)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = pd.DataFrame(sums / np.add.reduceat(present, starts),
+                             index=tickers, columns=_METRIC_COLUMNS)
+    sums = pd.DataFrame(sums, index=tickers, columns=_METRIC_COLUMNS)['operating_cashflow']
+    
+    date_values = df['date'].to_numpy()
+    dates = pd.DataFrame({
+        'min': np.fmin.reduceat(date_values, starts),
+        'max': np.fmax.reduceat(date_values, starts),
+    }, index=tickers)
+    counts = pd.Series(ends - starts, index=tickers)
+    
+    revenue_cagr = _cagr_series(firsts['revenue'], lasts['revenue'], counts)
+    net_income_cagr = _cagr_series(firsts['net_income'], lasts['net_income'], counts)
+    
+    table = pd.DataFrame({
+        'period_start': dates['min'],
+        'period_end': dates['max'],
+        'num_years': counts,
+        'revenue_cagr': revenue_cagr,
+        'revenue_start': firsts['revenue'],
+        'revenue_end': lasts['revenue'],
+        'revenue_total_growth': (lasts['revenue'] - firsts['revenue']) / firsts['revenue'] * 100,
+        'net_income_cagr': net_income_cagr,
+        'net_income_start': firsts['net_income'],
+        'net_income_end': lasts['net_income'],
+        'profit_margin_avg': means['profit_margin'],
+        'profit_margin_last': lasts['profit_margin'],
+        'operating_margin_avg': means['operating_margin'],
+        'operating_margin_trend': lasts['operating_margin'] - firsts['operating_margin'],
+        'total_cashflow': sums,
+        'avg_annual_cashflow': means['operating_cashflow'],
+        'debt_ratio_start': firsts['debt_to_asset'],
+        'debt_ratio_end': lasts['debt_to_asset'],
+        'debt_ratio_improvement': firsts['debt_to_asset'] - lasts['debt_to_asset'],
+        'asset_efficiency_avg': means['asset_efficiency'],
+        'asset_efficiency_trend': lasts['asset_efficiency'] - firsts['asset_efficiency'],
+    })
+    
+    table['performance_class'] = classify_performance_series(
+        table['revenue_total_growth'],
+        table['profit_margin_last'],
+        table['debt_ratio_improvement'],
+    )
+    
+    performance = {}
+    for ticker, row in zip(table.index, table.to_dict('records')):
+        performance[ticker] = {'ticker': ticker, **row}
+    
+    return performance
+
+
 def calculate_performance_metrics(company_data, ticker):
     """
     Calculate comprehensive performance metrics for a company
@@ -53,57 +154,18 @@ def calculate_performance_metrics(company_data, ticker):
     Returns:
         Dictionary with performance metrics
     """
-    metrics = {
-        'ticker': ticker,
-        'period_start': company_data['date'].min(),
-        'period_end': company_data['date'].max(),
-        'num_years': len(company_data),
-    }
-    
-    # Revenue Analysis
-    first_revenue = company_data['revenue'].iloc[0]
-    last_revenue = company_data['revenue'].iloc[-1]
-    metrics['revenue_cagr'] = calculate_cagr(first_revenue, last_revenue, len(company_data))
-    metrics['revenue_start'] = first_revenue
-    metrics['revenue_end'] = last_revenue
-    metrics['revenue_total_growth'] = ((last_revenue - first_revenue) / first_revenue) * 100
-    
-    # Profitability Analysis
-    first_net_income = company_data['net_income'].iloc[0]
-    last_net_income = company_data['net_income'].iloc[-1]
-    metrics['net_income_cagr'] = calculate_cagr(first_net_income, last_net_income, len(company_data))
-    metrics['net_income_start'] = first_net_income
-    metrics['net_income_end'] = last_net_income
-    metrics['profit_margin_avg'] = company_data['profit_margin'].mean()
-    metrics['profit_margin_last'] = company_data['profit_margin'].iloc[-1]
-    
-    # Operating Performance
-    metrics['operating_margin_avg'] = company_data['operating_margin'].mean()
-    metrics['operating_margin_trend'] = (
-        company_data['operating_margin'].iloc[-1] - company_data['operating_margin'].iloc[0]
-    )
-    
-    # Cash Flow Analysis
-    metrics['total_cashflow'] = company_data['operating_cashflow'].sum()
-    metrics['avg_annual_cashflow'] = company_data['operating_cashflow'].mean()
-    
-    # Balance Sheet Health
-    first_debt_ratio = company_data['debt_to_asset'].iloc[0]
-    last_debt_ratio = company_data['debt_to_asset'].iloc[-1]
-    metrics['debt_ratio_start'] = first_debt_ratio
-    metrics['debt_ratio_end'] = last_debt_ratio
-    metrics['debt_ratio_improvement'] = first_debt_ratio - last_debt_ratio
-    
-    # Asset Efficiency
-    metrics['asset_efficiency_avg'] = company_data['asset_efficiency'].mean()
-    metrics['asset_efficiency_trend'] = (
-        company_data['asset_efficiency'].iloc[-1] - company_data['asset_efficiency'].iloc[0]
+    return calculate_performance_table(company_data)[ticker]
+
+
+def _cagr_series(start, end, num_periods):
+    """Vectorized calculate_cagr; undefined entries are None."""
+    growth = _cagr_vec(
+        start.to_numpy(dtype=np.float64),
+        end.to_numpy(dtype=np.float64),
+        num_periods.to_numpy(dtype=np.float64),
     )
-    
-    # Performance Classification
-    metrics['performance_class'] = classify_performance(metrics)
-    
-    return metrics
+    cagr = pd.Series(growth * 100, index=start.index)
+    return cagr.astype(object).where(~((start <= 0) | (end <= 0)), None)
 
 
 def calculate_cagr(start_value, end_value, num_periods):
@@ -121,8 +183,12 @@ def calculate_cagr(start_value, end_value, num_periods):
     if start_value <= 0 or end_value <= 0:
         return None
     
-    cagr = (pow(end_value / start_value, 1 / num_periods) - 1) * 100
-    return cagr
+    growth = _cagr_vec(
+        np.array([start_value], dtype=np.float64),
+        np.array([end_value], dtype=np.float64),
+        np.array([num_periods], dtype=np.float64),
+    )
+    return float(growth[0]) * 100
 
 
 def classify_performance(metrics):
@@ -132,42 +198,45 @@ def classify_performance(metrics):
     Returns:
         Performance classification
     """
-    # Score based on revenue growth
-    revenue_growth = metrics['revenue_total_growth']
-    
-    # Score based on profitability
-    profit_margin = metrics['profit_margin_last']
-    
-    # Score based on debt improvement
-    debt_improvement = metrics['debt_ratio_improvement']
-    
-    # Calculate composite score
-    score = 0
-    if revenue_growth > 50:
-        score += 3  # Excellent growth
-    elif revenue_growth > 20:
-        score += 2  # Good growth
-    elif revenue_growth > 0:
-        score += 1  # Moderate growth
-    else:
-        score -= 1  # Declining
-    
-    if profit_margin > 20:
-        score += 2
-    elif profit_margin > 10:
-        score += 1
-    
-    if debt_improvement > 0:
-        score += 1
-    
-    if score >= 5:
-        return "Excellent"
-    elif score >= 2:
-        return "Good"
-    elif score >= 0:
-        return "Moderate"
-    else:
-        return "Concerning"
+    classes = classify_performance_series(
+        np.array([metrics['revenue_total_growth']], dtype=float),
+        np.array([metrics['profit_margin_last']], dtype=float),
+        np.array([metrics['debt_ratio_improvement']], dtype=float),
+    )
+    return classes[0]
+
+
+def classify_performance_series(revenue_growth, profit_margin, debt_improvement):
+    """
+    Classify performance for many companies at once
+    
+    Args:
+        revenue_growth: Total revenue growth % per company
+        profit_margin: Latest profit margin % per company
+        debt_improvement: Debt-to-asset improvement per company
+    
+    Returns:
+        Array (or Series, if given Series) of performance classifications
+    """
+    rg = np.asarray(revenue_growth, dtype=float)
+    pm = np.asarray(profit_margin, dtype=float)
+    di = np.asarray(debt_improvement, dtype=float)
+    
+    # Composite score: growth (-1..3) + profitability (0..2) + deleveraging (0..1)
+    score = (
+        np.select([rg > 50, rg > 20, rg > 0], [3, 2, 1], default=-1)
+        + np.select([pm > 20, pm > 10], [2, 1], default=0)
+        + (di > 0).astype(int)
+    )
+    classes = np.select(
+        [score >= 5, score >= 2, score >= 0],
+        ['Excellent', 'Good', 'Moderate'],
+        default='Concerning',
+    ).astype(object)
+    
+    if isinstance(revenue_growth, pd.Series):
+        return pd.Series(classes, index=revenue_growth.index)
+    return classes
 
 
 def print_performance_summary(ticker, metrics):
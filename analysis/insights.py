@@ -3,7 +3,7 @@
 
 import pandas as pd
 import numpy as np
-from .data_connection import get_standard_table_data
+from .data_connection import get_standard_table_data, sorted_by_ticker_date
 
 
 def extract_key_insights():
@@ -26,38 +26,45 @@ def extract_key_insights():
     print("\n--- Market-Wide Insights ---")
     market_insights = analyze_market_trends(df, companies)
     insights.extend(market_insights)
-    for insight in market_insights:
-        print(f"  • {insight}")
+    _print_bullets(market_insights)
     
     # 2. Company-Specific Insights
     print("\n--- Company-Specific Insights ---")
-    for company in companies:
-        company_data = df[df['ticker'] == company].sort_values('date')
-        company_insights = analyze_company_trends(company_data, company)
-        insights.extend(company_insights)
-        for insight in company_insights:
-            print(f"  • {insight}")
+    trends_by_company = analyze_company_trends_table(df)
+    company_insights = [insight for company in companies for insight in trends_by_company.get(company, [])]
+    insights.extend(company_insights)
+    _print_bullets(company_insights)
     
     # 3. Anomalies
     print("\n--- Detected Anomalies ---")
     anomalies = detect_anomalies(df, companies)
     insights.extend(anomalies)
     if anomalies:
-        for anomaly in anomalies:
-            print(f"  ⚠ {anomaly}")
+        _print_bullets(anomalies, marker="⚠")
     else:
         print("  ✓ No significant anomalies detected")
     
     return insights
 
 
+def _print_bullets(lines, marker="•"):
+    """Print a list of insight lines as one block write."""
+    if lines:
+        print("\n".join(f"  {marker} {line}" for line in lines))
+
+
 def analyze_market_trends(df, companies):
     """Analyze overall market trends"""
     insights = []
     
+    # Group the (ticker, date)-ordered rows once; head/tail give each ticker's earliest/latest row
+    by_ticker = sorted_by_ticker_date(df).groupby('ticker', sort=False, observed=True)[['revenue', 'debt_to_asset']]
+    earliest = by_ticker.head(1)
+    latest = by_ticker.tail(1)
+    
     # Market size growth
-    latest_total_revenue = df.sort_values('date').groupby('ticker')['revenue'].tail(1).sum()
-    earliest_total_revenue = df.sort_values('date').groupby('ticker')['revenue'].head(1).sum()
+    latest_total_revenue = latest['revenue'].sum()
+    earliest_total_revenue = earliest['revenue'].sum()
     market_growth = ((latest_total_revenue - earliest_total_revenue) / earliest_total_revenue) * 100
     
     insights.append(f"Total market (AAPL+MSFT+GOOGL) revenue grew {market_growth:.1f}% from 2006 to 2025")
@@ -68,81 +75,108 @@ def analyze_market_trends(df, companies):
     
     # Leverage analysis
     avg_debt_ratio = df['debt_to_asset'].mean()
-    latest_avg_debt = df.sort_values('date').groupby('ticker')['debt_to_asset'].tail(1).mean()
-    insights.append(f"Average debt ratio decreased from {df.sort_values('date').groupby('ticker')['debt_to_asset'].head(1).mean():.2f} to {latest_avg_debt:.2f}")
+    latest_avg_debt = latest['debt_to_asset'].mean()
+    insights.append(f"Average debt ratio decreased from {earliest['debt_to_asset'].mean():.2f} to {latest_avg_debt:.2f}")
     
     return insights
 
 
 def analyze_company_trends(company_data, ticker):
     """Analyze company-specific trends"""
-    insights = []
+    return analyze_company_trends_table(company_data).get(ticker, [])
+
+
+def analyze_company_trends_table(df):
+    """
+    Analyze company-specific trends for every ticker in one grouped pass
     
-    # Revenue trajectory
-    first_revenue = company_data['revenue'].iloc[0]
-    last_revenue = company_data['revenue'].iloc[-1]
-    revenue_multiplier = last_revenue / first_revenue
-    insights.append(f"{ticker}: Revenue grew {revenue_multiplier:.1f}x (${first_revenue/1e9:.1f}B → ${last_revenue/1e9:.1f}B)")
-    
-    # Profitability trajectory
-    first_margin = company_data['profit_margin'].iloc[0]
-    last_margin = company_data['profit_margin'].iloc[-1]
-    insights.append(f"{ticker}: Profit margin at {last_margin:.2f}% (from {first_margin:.2f}%)")
-    
-    # Debt reduction success
-    first_debt = company_data['debt_to_asset'].iloc[0]
-    last_debt = company_data['debt_to_asset'].iloc[-1]
-    if first_debt > last_debt:
-        debt_reduction = ((first_debt - last_debt) / first_debt) * 100
-        insights.append(f"{ticker}: Reduced debt-to-assets by {debt_reduction:.1f}% (stronger balance sheet)")
-    
-    # Growth stability
-    growth_rates = company_data['revenue_growth'].dropna().values
-    if len(growth_rates) > 0:
-        avg_growth = np.mean(growth_rates)
-        growth_volatility = np.std(growth_rates)
-        insights.append(f"{ticker}: Average revenue growth {avg_growth:.1f}% (volatility: {growth_volatility:.1f}%)")
+    Returns:
+        Dictionary mapping ticker to its list of insight strings
+    """
+    d = sorted_by_ticker_date(df)
+    g = d.groupby('ticker', sort=False, observed=True)
+    
+    # head/tail keep NaN endpoints, matching positional first/last rows
+    endpoint_cols = ['revenue', 'profit_margin', 'debt_to_asset']
+    firsts = g.head(1).set_index('ticker')[endpoint_cols]
+    lasts = g.tail(1).set_index('ticker')[endpoint_cols]
+    growth = pd.DataFrame({
+        'count': g['revenue_growth'].count(),
+        'mean': g['revenue_growth'].mean(),
+        'std': g['revenue_growth'].std(ddof=0),  # population std, as np.std
+    })
+    
+    summary = pd.concat([firsts.add_prefix('first_'), lasts.add_prefix('last_'),
+                         growth.add_prefix('growth_')], axis=1)
+    
+    insights_by_ticker = {}
+    for row in summary.itertuples():
+        ticker = row.Index
+        insights = []
+        
+        # Revenue trajectory
+        revenue_multiplier = row.last_revenue / row.first_revenue
+        insights.append(f"{ticker}: Revenue grew {revenue_multiplier:.1f}x (${row.first_revenue/1e9:.1f}B → ${row.last_revenue/1e9:.1f}B)")
+        
+        # Profitability trajectory
+        insights.append(f"{ticker}: Profit margin at {row.last_profit_margin:.2f}% (from {row.first_profit_margin:.2f}%)")
+        
+        # Debt reduction success
+        if row.first_debt_to_asset > row.last_debt_to_asset:
+            debt_reduction = ((row.first_debt_to_asset - row.last_debt_to_asset) / row.first_debt_to_asset) * 100
+            insights.append(f"{ticker}: Reduced debt-to-assets by {debt_reduction:.1f}% (stronger balance sheet)")
+        
+        # Growth stability
+        if row.growth_count > 0:
+            insights.append(f"{ticker}: Average revenue growth {row.growth_mean:.1f}% (volatility: {row.growth_std:.1f}%)")
+        
+        insights_by_ticker[ticker] = insights
     
-    return insights
+    return insights_by_ticker
 
 
 def detect_anomalies(df, companies):
     """Detect unusual patterns or anomalies"""
-    anomalies = []
+    d = sorted_by_ticker_date(df)
+    g = d.groupby('ticker', sort=False, observed=True)
+    latest = g.tail(1).set_index('ticker')
+    
+    # 1. Sudden profit margin changes (reported against the earlier year of the pair)
+    margin_changes = g['profit_margin'].diff()
+    drop_mask = margin_changes < -5
+    drops = pd.DataFrame({
+        'ticker': d.loc[drop_mask, 'ticker'],
+        'year': g['date'].shift()[drop_mask].dt.year,
+        'change': margin_changes[drop_mask],
+    })
+    
+    # 2. Negative growth or profitability
+    negative_years = (d['net_income'] < 0).groupby(d['ticker'], observed=True).sum()
+    
+    # 3. Asset efficiency degradation: latest year vs the mean of all earlier years
+    earlier = d[g.cumcount(ascending=False) > 0]
+    by_earlier = earlier.groupby('ticker', observed=True)['asset_efficiency']
+    historical_avg = by_earlier.mean().where(~earlier['asset_efficiency'].isna().groupby(earlier['ticker'], observed=True).any())
     
+    anomalies = []
     for company in companies:
-        company_data = df[df['ticker'] == company].sort_values('date')
-        
-        # 1. Sudden profit margin changes
-        profit_margins = company_data['profit_margin'].values
-        margin_changes = np.diff(profit_margins)
-        large_margin_drops = np.where(margin_changes < -5)[0]
-        
-        if len(large_margin_drops) > 0:
-            for idx in large_margin_drops:
-                year = company_data.iloc[idx]['date'].year
-                change = margin_changes[idx]
-                anomalies.append(
-                    f"{company} (FY {year}): Profit margin dropped {change:.2f}% - investigate profitability decline"
-                )
-        
-        # 2. Negative growth or profitability
-        negative_income = company_data[company_data['net_income'] < 0]
-        if len(negative_income) > 0:
-            anomalies.append(f"{company} showed negative net income in {len(negative_income)} years")
+        for row in drops[drops['ticker'] == company].itertuples():
+            anomalies.append(
+                f"{company} (FY {row.year}): Profit margin dropped {row.change:.2f}% - investigate profitability decline"
+            )
         
-        # 3. Asset efficiency degradation
-        efficiency = company_data['asset_efficiency'].values
-        recent_efficiency = efficiency[-1]
-        historical_avg = np.mean(efficiency[:-1])
+        if negative_years.get(company, 0) > 0:
+            anomalies.append(f"{company} showed negative net income in {negative_years[company]} years")
         
-        if recent_efficiency < (historical_avg * 0.8):  # 20% below average
+        recent_efficiency = latest.at[company, 'asset_efficiency']
+        avg_efficiency = historical_avg.get(company, np.nan)
+        if recent_efficiency < (avg_efficiency * 0.8):  # 20% below average
             anomalies.append(
-                f"{company}: Asset efficiency degraded to {recent_efficiency:.2f}x (below historical avg {historical_avg:.2f}x)"
+                f"{company}: Asset efficiency degraded to {recent_efficiency:.2f}x (below historical avg {avg_efficiency:.2f}x)"
             )
         
         # 4. High debt ratio
-        latest_debt = company_data['debt_to_asset'].iloc[-1]
+        latest_debt = latest.at[company, 'debt_to_asset']
         if latest_debt > 0.7:
             anomalies.append(f"{company}: High debt-to-assets ratio ({latest_debt:.2f}) - potential financial risk")
     
@@ -153,21 +187,21 @@ def generate_insights_report(output_path='analysis_report.txt'):
     """Generate a comprehensive insights report"""
     insights = extract_key_insights()
     
-    report = "FINCAST - FINANCIAL ANALYSIS REPORT\n"
-    report += "=" * 60 + "\n"
-    report += f"Generated: 2026-02-26\n"
-    report += f"Total Insights Generated: {len(insights)}\n"
-    report += "=" * 60 + "\n\n"
-    
-    report += "KEY INSIGHTS AND FINDINGS:\n"
-    report += "-" * 60 + "\n"
-    for i, insight in enumerate(insights, 1):
-        report += f"{i}. {insight}\n"
-    
-    report += "\n" + "=" * 60 + "\n"
-    report += "END OF REPORT\n"
-    
-    return report
+    # Build the lines once and join, rather than re-copying the report per insight
+    lines = [
+        "FINCAST - FINANCIAL ANALYSIS REPORT",
+        "=" * 60,
+        "Generated: 2026-02-26",
+        f"Total Insights Generated: {len(insights)}",
+        "=" * 60,
+        "",
+        "KEY INSIGHTS AND FINDINGS:",
+        "-" * 60,
+    ]
+    lines.extend(f"{i}. {insight}" for i, insight in enumerate(insights, 1))
+    lines += ["", "=" * 60, "END OF REPORT", ""]
+    
+    return "\n".join(lines)
 
 
 if __name__ == "__main__":
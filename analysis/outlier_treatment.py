@@ -3,63 +3,216 @@ Outlier Treatment Module - Phase 3.2
 Detects statistical outliers and provides treatment recommendations
 """
 
+from collections import namedtuple
+
 import pandas as pd
 import numpy as np
-from scipy import stats
+from numba import njit, prange
 import warnings
 warnings.filterwarnings('ignore')
 
 from .data_connection import get_analysis_data
 
 
-def detect_statistical_outliers(df, method='iqr', threshold=1.5):
-    """
-    Detect outliers using statistical methods.
-    
-    Args:
-        df: DataFrame with numerical features
-        method: 'iqr' (Interquartile Range) or 'zscore'
-        threshold: For IQR: multiplier (1.5 standard), for z-score: threshold (typically 3)
-        
-    Returns:
-        dict with outlier detection results
-    """
+@njit(cache=True)
+def _percentile_of_sorted(sorted_values, q):
+    """Linear-interpolated percentile, bit-for-bit with np.percentile."""
+    n = sorted_values.shape[0]
+    if n == 0:
+        return np.nan
+    pos = (n - 1) * (q / 100.0)
+    lo = int(np.floor(pos))
+    hi = min(lo + 1, n - 1)
+    t = pos - lo
+    diff = sorted_values[hi] - sorted_values[lo]
+    if t >= 0.5:
+        return sorted_values[hi] - diff * (1.0 - t)
+    return sorted_values[lo] + diff * t
+
+@njit(parallel=True, cache=True)
+def _column_percentiles(values, qs):
+    """Per-column NaN-skipping percentiles; one sort per column, columns in parallel."""
+    n_cols = values.shape[1]
+    out = np.empty((qs.shape[0], n_cols))
+    for j in prange(n_cols):
+        col = values[:, j]
+        sorted_col = np.sort(col[~np.isnan(col)])
+        for k in range(qs.shape[0]):
+            out[k, j] = _percentile_of_sorted(sorted_col, qs[k])
+    return out
+
+@njit(parallel=True, cache=True)
+def _column_counts(values, lower, upper):
+    """Per-column NaN/Inf/zero counts and counts below lower / above upper, one read per value."""
+    n_rows, n_cols = values.shape
+    nan_counts = np.zeros(n_cols, dtype=np.int64)
+    inf_counts = np.zeros(n_cols, dtype=np.int64)
+    zero_counts = np.zeros(n_cols, dtype=np.int64)
+    below = np.zeros(n_cols, dtype=np.int64)
+    above = np.zeros(n_cols, dtype=np.int64)
+    for j in prange(n_cols):
+        for i in range(n_rows):
+            v = values[i, j]
+            if np.isnan(v):
+                nan_counts[j] += 1
+                continue
+            if np.isinf(v):
+                inf_counts[j] += 1
+            elif v == 0:
+                zero_counts[j] += 1
+            if v < lower[j]:
+                below[j] += 1
+            elif v > upper[j]:
+                above[j] += 1
+    return nan_counts, inf_counts, zero_counts, below, above
+
+
+def _numeric_block(df):
+    """Numeric columns and a column-major float64 copy of their values."""
     numerical_cols = df.select_dtypes(include=[np.number]).columns
-    outliers = {}
+    values = df[numerical_cols].to_numpy(dtype=np.float64, na_value=np.nan)
+    return numerical_cols, np.asfortranarray(values)
+
+
+def _outlier_results(df, numerical_cols, values, method, threshold, quartiles=None):
+    """Build detect_statistical_outliers' dict from the numeric block."""
+    valid_counts = (~np.isnan(values)).sum(axis=0)
     
-    for col in numerical_cols:
-        data = df[col].dropna()
-        
+    # All column bounds at once; NaNs never compare as outliers
+    with warnings.catch_warnings(), np.errstate(invalid='ignore', divide='ignore'):
+        warnings.simplefilter('ignore', RuntimeWarning)
         if method == 'iqr':
-            Q1 = data.quantile(0.25)
-            Q3 = data.quantile(0.75)
+            if quartiles is None:
+                quartiles = _column_percentiles(values, np.array([25.0, 75.0]))
+            Q1, Q3 = quartiles
             IQR = Q3 - Q1
-            lower_bound = Q1 - threshold * IQR
-            upper_bound = Q3 + threshold * IQR
-            
-            outlier_mask = (data < lower_bound) | (data > upper_bound)
-            
+            lower_bounds = Q1 - threshold * IQR
+            upper_bounds = Q3 + threshold * IQR
+            outlier_mask = (values < lower_bounds) | (values > upper_bounds)
         elif method == 'zscore':
-            z_scores = np.abs(stats.zscore(data))
+            z_scores = np.abs((values - np.nanmean(values, axis=0)) / np.nanstd(values, axis=0))
             outlier_mask = z_scores > threshold
-        
-        outlier_indices = data.index[outlier_mask].tolist() if outlier_mask.any() else []
+    
+    outlier_counts = outlier_mask.sum(axis=0)
+    outliers = {}
+    
+    for j, col in enumerate(numerical_cols):
+        col_mask = outlier_mask[:, j]
         
         outliers[col] = {
             'method': method,
-            'outlier_count': outlier_mask.sum(),
-            'outlier_percentage': (outlier_mask.sum() / len(data) * 100) if len(data) > 0 else 0,
+            'outlier_count': outlier_counts[j],
+            'outlier_percentage': (outlier_counts[j] / valid_counts[j] * 100) if valid_counts[j] > 0 else 0,
             'bounds': {
-                'lower': lower_bound if method == 'iqr' else None,
-                'upper': upper_bound if method == 'iqr' else None
+                'lower': lower_bounds[j] if method == 'iqr' else None,
+                'upper': upper_bounds[j] if method == 'iqr' else None
             },
-            'outlier_values': data[outlier_mask].tolist(),
-            'outlier_indices': outlier_indices
+            'outlier_values': df[col].to_numpy()[col_mask].tolist(),
+            'outlier_indices': df.index[col_mask].tolist()
         }
     
     return outliers
 
 
+def _extreme_results(numerical_cols, percentile, lower_bounds, upper_bounds, low_counts, high_counts):
+    """Build detect_extreme_values' dict from precomputed bounds and counts."""
+    extreme_values = {}
+    for j, col in enumerate(numerical_cols):
+        extreme_values[col] = {
+            'lower_percentile': 100 - percentile,
+            'upper_percentile': percentile,
+            'lower_bound': lower_bounds[j],
+            'upper_bound': upper_bounds[j],
+            'extreme_low_count': int(low_counts[j]),
+            'extreme_high_count': int(high_counts[j]),
+            'extreme_values_total': int(low_counts[j] + high_counts[j])
+        }
+    
+    return extreme_values
+
+
+_FLOAT_DTYPES = [np.dtype('float64'), np.dtype('float32')]
+_INT_DTYPES = [np.dtype('int64'), np.dtype('int32')]
+
+
+def _anomaly_results(df, numerical_cols, nan_counts, inf_counts, zero_counts):
+    """Build flag_anomalies' dict from per-column counts over the numeric block."""
+    position = {col: j for j, col in enumerate(numerical_cols)}
+    other_nans = df[df.columns.difference(numerical_cols, sort=False)].isna().sum()
+    
+    # Resolve dtype membership once instead of comparing dtypes per column
+    dtypes = df.dtypes
+    float_cols = set(df.columns[dtypes.isin(_FLOAT_DTYPES)])
+    counted_cols = float_cols | set(df.columns[dtypes.isin(_INT_DTYPES)])
+    anomalies = {}
+    
+    for col in df.columns:
+        j = position.get(col)
+        nan_count = nan_counts[j] if j is not None else other_nans[col]
+        inf_count = inf_counts[j] if col in float_cols else 0
+        zero_count = zero_counts[j] if col in counted_cols else 0
+        
+        anomalies[col] = {
+            'nan_count': nan_count,
+            'inf_count': inf_count,
+            'zero_count': zero_count,
+            'total_anomalies': nan_count + inf_count + zero_count,
+            'anomaly_percentage': ((nan_count + inf_count + zero_count) / len(df) * 100) if len(df) > 0 else 0
+        }
+    
+    return anomalies
+
+
+def analyze_columns(df, threshold=1.5, percentile=95):
+    """
+    Run IQR outlier, extreme value and anomaly detection in one pass.
+    
+    The numeric block is materialized once, every column is sorted once for
+    all four percentiles, and one counting pass serves both the extreme-value
+    and the NaN/Inf/zero counts.
+    
+    Args:
+        df: DataFrame with numerical features
+        threshold: IQR multiplier
+        percentile: Percentile threshold for extreme values
+        
+    Returns:
+        tuple: (outliers, extreme_values, anomalies) as returned by
+        detect_statistical_outliers, detect_extreme_values and flag_anomalies
+    """
+    numerical_cols, values = _numeric_block(df)
+    
+    percentiles = _column_percentiles(
+        values, np.array([25.0, 75.0, 100.0 - percentile, float(percentile)])
+    )
+    nan_counts, inf_counts, zero_counts, low_counts, high_counts = _column_counts(
+        values, percentiles[2], percentiles[3]
+    )
+    
+    outliers = _outlier_results(df, numerical_cols, values, 'iqr', threshold, quartiles=percentiles[:2])
+    extreme_values = _extreme_results(numerical_cols, percentile, percentiles[2], percentiles[3],
+                                      low_counts, high_counts)
+    anomalies = _anomaly_results(df, numerical_cols, nan_counts, inf_counts, zero_counts)
+    
+    return outliers, extreme_values, anomalies
+
+
+def detect_statistical_outliers(df, method='iqr', threshold=1.5):
+    """
+    Detect outliers using statistical methods.
+    
+    Args:
+        df: DataFrame with numerical features
+        method: 'iqr' (Interquartile Range) or 'zscore'
+        threshold: For IQR: multiplier (1.5 standard), for z-score: threshold (typically 3)
+        
+    Returns:
+        dict with outlier detection results
+    """
+    numerical_cols, values = _numeric_block(df)
+    return _outlier_results(df, numerical_cols, values, method, threshold)
+
+
 def detect_extreme_values(df, percentile=95):
     """
     Detect extreme values using percentile-based approach.
@@ -71,32 +224,15 @@ def detect_extreme_values(df, percentile=95):
     Returns:
         dict with extreme value detection
     """
-    numerical_cols = df.select_dtypes(include=[np.number]).columns
-    extreme_values = {}
+    numerical_cols, values = _numeric_block(df)
     
-    for col in numerical_cols:
-        data = df[col].dropna()
-        
-        lower_pct = 100 - percentile
-        upper_pct = percentile
-        
-        lower_bound = data.quantile(lower_pct / 100)
-        upper_bound = data.quantile(upper_pct / 100)
-        
-        extreme_low = data[data < lower_bound]
-        extreme_high = data[data > upper_bound]
-        
-        extreme_values[col] = {
-            'lower_percentile': lower_pct,
-            'upper_percentile': upper_pct,
-            'lower_bound': lower_bound,
-            'upper_bound': upper_bound,
-            'extreme_low_count': len(extreme_low),
-            'extreme_high_count': len(extreme_high),
-            'extreme_values_total': len(extreme_low) + len(extreme_high)
-        }
+    lower_bounds, upper_bounds = _column_percentiles(
+        values, np.array([100.0 - percentile, float(percentile)])
+    )
+    _, _, _, low_counts, high_counts = _column_counts(values, lower_bounds, upper_bounds)
     
-    return extreme_values
+    return _extreme_results(numerical_cols, percentile, lower_bounds, upper_bounds,
+                            low_counts, high_counts)
 
 
 def flag_anomalies(df):
@@ -109,22 +245,17 @@ def flag_anomalies(df):
     Returns:
         dict with anomaly flags
     """
-    anomalies = {}
+    numerical_cols, values = _numeric_block(df)
     
-    for col in df.columns:
-        nan_count = df[col].isna().sum()
-        inf_count = np.isinf(df[col]).sum() if df[col].dtype in ['float64', 'float32'] else 0
-        zero_count = (df[col] == 0).sum() if df[col].dtype in ['int64', 'int32', 'float64', 'float32'] else 0
-        
-        anomalies[col] = {
-            'nan_count': nan_count,
-            'inf_count': inf_count,
-            'zero_count': zero_count,
-            'total_anomalies': nan_count + inf_count + zero_count,
-            'anomaly_percentage': ((nan_count + inf_count + zero_count) / len(df) * 100) if len(df) > 0 else 0
-        }
+    # One fused pass over the numeric block: NaN, Inf and zero counted per value
+    no_bound = np.full(len(numerical_cols), np.nan)
+    nan_counts, inf_counts, zero_counts, _, _ = _column_counts(values, no_bound, no_bound)
     
-    return anomalies
+    return _anomaly_results(df, numerical_cols, nan_counts, inf_counts, zero_counts)
+
+
+# One treatment recommendation; a tuple per record instead of a dict
+TreatmentRecommendation = namedtuple('TreatmentRecommendation', 'column issue treatment severity')
 
 
 def generate_treatment_recommendations(outliers, extreme_values, anomalies):
@@ -137,7 +268,7 @@ def generate_treatment_recommendations(outliers, extreme_values, anomalies):
         anomalies: Anomaly flags
         
     Returns:
-        List of treatment recommendations
+        List of TreatmentRecommendation(column, issue, treatment, severity)
     """
     recommendations = []
     
@@ -146,52 +277,56 @@ def generate_treatment_recommendations(outliers, extreme_values, anomalies):
         if result['outlier_count'] > 0:
             pct = result['outlier_percentage']
             if pct > 10:
-                recommendations.append({
-                    'column': col,
-                    'issue': f"High outlier percentage ({pct:.1f}%)",
-                    'treatment': "Investigate data quality; consider separate analysis for outlier subset",
-                    'severity': 'high'
-                })
+                recommendations.append(TreatmentRecommendation(
+                    column=col,
+                    issue=f"High outlier percentage ({pct:.1f}%)",
+                    treatment="Investigate data quality; consider separate analysis for outlier subset",
+                    severity='high'
+                ))
             elif pct > 5:
-                recommendations.append({
-                    'column': col,
-                    'issue': f"Moderate outlier percentage ({pct:.1f}%)",
-                    'treatment': "Apply robust scaling or IOR transformation",
-                    'severity': 'medium'
-                })
+                recommendations.append(TreatmentRecommendation(
+                    column=col,
+                    issue=f"Moderate outlier percentage ({pct:.1f}%)",
+                    treatment="Apply robust scaling or IOR transformation",
+                    severity='medium'
+                ))
             else:
-                recommendations.append({
-                    'column': col,
-                    'issue': f"Low outlier count ({result['outlier_count']})",
-                    'treatment': "Safe to use; consider Winsorization if needed",
-                    'severity': 'low'
-                })
+                recommendations.append(TreatmentRecommendation(
+                    column=col,
+                    issue=f"Low outlier count ({result['outlier_count']})",
+                    treatment="Safe to use; consider Winsorization if needed",
+                    severity='low'
+                ))
     
     # Anomaly recommendations
     for col, result in anomalies.items():
         if result['total_anomalies'] > 0:
             if result['nan_count'] > 0:
-                recommendations.append({
-                    'column': col,
-                    'issue': f"Missing values ({result['nan_count']})",
-                    'treatment': "Impute using median/mean or forward-fill for time-series",
-                    'severity': 'medium'
-                })
+                recommendations.append(TreatmentRecommendation(
+                    column=col,
+                    issue=f"Missing values ({result['nan_count']})",
+                    treatment="Impute using median/mean or forward-fill for time-series",
+                    severity='medium'
+                ))
             if result['inf_count'] > 0:
-                recommendations.append({
-                    'column': col,
-                    'issue': f"Infinite values ({result['inf_count']})",
-                    'treatment': "Replace with max/min finite values",
-                    'severity': 'high'
-                })
+                recommendations.append(TreatmentRecommendation(
+                    column=col,
+                    issue=f"Infinite values ({result['inf_count']})",
+                    treatment="Replace with max/min finite values",
+                    severity='high'
+                ))
     
     return recommendations
 
 
-def run_outlier_treatment():
+def run_outlier_treatment(data=None):
     """
     Execute complete outlier detection and treatment analysis.
     
+    Args:
+        data: (standard_df, category_df, merged_df) from get_analysis_data();
+            fetched when omitted, so callers can share one load
+        
     Returns:
         dict with all outlier analysis results
     """
@@ -202,16 +337,16 @@ def run_outlier_treatment():
     # Load data
     print("\n[1/4] Loading data...")
     try:
-        _, _, df = get_analysis_data()  # Unpack tuple (standard_df, category_df, merged_df)
+        _, _, df = data if data is not None else get_analysis_data()
         print(f"✓ Data loaded: {len(df)} records, {len(df.columns)} columns")
     except Exception as e:
         print(f"✗ Error loading data: {e}")
         return None
     
-    # Detect statistical outliers (IQR method)
+    # Detect statistical outliers (IQR method); extremes and anomalies come from the same pass
     print("\n[2/4] Detecting outliers using IQR method...")
     try:
-        outliers_iqr = detect_statistical_outliers(df, method='iqr', threshold=1.5)
+        outliers_iqr, extreme_values, anomalies = analyze_columns(df, threshold=1.5, percentile=95)
         outlier_columns = [col for col, result in outliers_iqr.items() if result['outlier_count'] > 0]
         print(f"✓ IQR method: {len(outlier_columns)} columns with outliers")
         for col in outlier_columns[:5]:  # Show first 5
@@ -220,12 +355,11 @@ def run_outlier_treatment():
             print(f"  - {col}: {count} outliers ({pct:.1f}%)")
     except Exception as e:
         print(f"✗ Error: {e}")
-        outliers_iqr = {}
+        outliers_iqr, extreme_values, anomalies = {}, {}, {}
     
     # Detect extreme values
     print("\n[3/4] Detecting extreme values (95th percentile)...")
     try:
-        extreme_values = detect_extreme_values(df, percentile=95)
         extreme_cols = [col for col, result in extreme_values.items() 
                        if result['extreme_values_total'] > 0]
         print(f"✓ Extreme values detected in {len(extreme_cols)} columns")
@@ -239,7 +373,6 @@ def run_outlier_treatment():
     # Flag anomalies and generate recommendations
     print("\n[4/4] Flagging anomalies and generating recommendations...")
     try:
-        anomalies = flag_anomalies(df)
         anomaly_cols = [col for col, result in anomalies.items() 
                        if result['total_anomalies'] > 0]
         print(f"✓ Anomalies detected in {len(anomaly_cols)} columns")
@@ -252,7 +385,7 @@ def run_outlier_treatment():
         recommendations = generate_treatment_recommendations(outliers_iqr, extreme_values, anomalies)
         print(f"\n✓ Treatment recommendations generated: {len(recommendations)}")
         for i, rec in enumerate(recommendations[:5], 1):
-            print(f"  {i}. [{rec['severity'].upper()}] {rec['column']}: {rec['treatment']}")
+            print(f"  {i}. [{rec.severity.upper()}] {rec.column}: {rec.treatment}")
     except Exception as e:
         print(f"✗ Error: {e}")
         recommendations = []
@@ -24,8 +24,8 @@ def compare_peers():
         print("✗ Need at least 2 companies for peer comparison")
         return
     
-    # Get latest year data for each company
-    latest_data = df.sort_values('date').groupby('ticker').tail(1)
+    # Get latest year data for each company (one grouped max, no full sort)
+    latest_data = df.loc[df.groupby('ticker', sort=False, observed=True)['date'].idxmax()]
     
     comparison = {}
     
@@ -51,17 +51,12 @@ def compare_peers():
     
     # Growth Comparison (Average historical growth rates)
     print("\n--- Growth Rates (Average Historical) ---")
-    growth_df = pd.DataFrame()
-    for company in companies:
-        company_data = df[df['ticker'] == company]
-        avg_revenue_growth = company_data['revenue_growth'].mean()
-        avg_income_growth = company_data['net_income_growth'].mean()
-        
-        growth_df = pd.concat([growth_df, pd.DataFrame({
-            'ticker': [company],
-            'avg_revenue_growth': [avg_revenue_growth],
-            'avg_income_growth': [avg_income_growth],
-        })], ignore_index=True)
+    growth_df = (
+        df.groupby('ticker', observed=True)[['revenue_growth', 'net_income_growth']]
+        .mean()
+        .rename(columns={'revenue_growth': 'avg_revenue_growth', 'net_income_growth': 'avg_income_growth'})
+        .reset_index()
+    )
     
     growth_df = growth_df.sort_values('avg_revenue_growth', ascending=False)
     print(growth_df[['ticker', 'avg_revenue_growth', 'avg_income_growth']].to_string(index=False))
@@ -121,7 +116,7 @@ def get_peer_rankings():
         DataFrame with rankings
     """
     df = get_standard_table_data()
-    latest_data = df.sort_values('date').groupby('ticker').tail(1)
+    latest_data = df.loc[df.groupby('ticker', sort=False, observed=True)['date'].idxmax()]
     
     rankings = pd.DataFrame({
         'Company': latest_data['ticker'].values,
@@ -130,10 +125,10 @@ def get_peer_rankings():
         'Financial Health (1 - Debt Ratio)': (1 - latest_data['debt_to_asset']).values,
     })
     
-    # Rank each column (1 = best)
-    for col in rankings.columns:
-        if col != 'Company':
-            rankings[f'{col} Rank'] = rankings[col].rank(ascending=False).astype(int)
+    # Rank every metric column in one 2-D pass (1 = best); ties keep pandas' average rank
+    metric_cols = rankings.columns.drop('Company')
+    ranks = rankings[metric_cols].rank(ascending=False).astype(int)
+    rankings[[f'{col} Rank' for col in metric_cols]] = ranks.to_numpy()
     
     return rankings
 
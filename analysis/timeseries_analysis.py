@@ -3,17 +3,40 @@ Time Series Analysis Module - Phase 3.2
 Decomposes time-series patterns, detects seasonality, and identifies trends
 """
 
+import glob
+import hashlib
+import os
+import pickle
+
 import pandas as pd
 import numpy as np
-from sklearn.linear_model import LinearRegression
+from numpy.lib.stride_tricks import sliding_window_view
 import warnings
 warnings.filterwarnings('ignore')
 
 from .data_connection import get_standard_table_data
 
 
+# Finished analyses are memoized on disk, keyed by a hash of the input table.
+# Bump the version whenever the analysis output changes for the same input.
+CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "cache"
+)
+_CACHE_VERSION = 1
+
+_TIMESERIES_ALIASES = {
+    'total_revenue': 'revenue',
+    'net_profit': 'net_income',
+    'operating_expenses': None,
+}
+
+
 def _normalize_timeseries_columns(df):
     """Bridge legacy column names to current staged schema."""
+    # Already-normalized frames (e.g. per-company groups) are returned as is
+    if 'fiscal_year' in df.columns and all(col in df.columns for col in _TIMESERIES_ALIASES):
+        return df
+
     out = df.copy()
 
     if 'fiscal_year' not in out.columns:
@@ -22,13 +45,7 @@ def _normalize_timeseries_columns(df):
         else:
             out['fiscal_year'] = np.arange(len(out))
 
-    alias_map = {
-        'total_revenue': 'revenue',
-        'net_profit': 'net_income',
-        'operating_expenses': None,
-    }
-
-    for target_col, source_col in alias_map.items():
+    for target_col, source_col in _TIMESERIES_ALIASES.items():
         if target_col not in out.columns:
             if source_col and source_col in out.columns:
                 out[target_col] = out[source_col]
@@ -38,6 +55,57 @@ def _normalize_timeseries_columns(df):
     return out
 
 
+def _company_timeseries(df, ticker=None):
+    """Normalize, filter to ticker and order by fiscal year; no-ops for prepared frames."""
+    df = _normalize_timeseries_columns(df)
+
+    if ticker:
+        df = df[df['ticker'] == ticker]
+    
+    if not df['fiscal_year'].is_monotonic_increasing:
+        df = df.sort_values('fiscal_year')
+    
+    return df
+
+
+def _fit_linear_trends(values):
+    """
+    Least-squares line against t = 0..n-1 for every column of values at once.
+    
+    Closed-form OLS with one shared time axis, so all metrics of a company are
+    fitted in a few array reductions instead of one LinearRegression fit per
+    metric. NaN entries are left out of their column's fit.
+    
+    Args:
+        values: (n, k) array, one metric per column
+        
+    Returns:
+        tuple of (slopes, intercepts, fitted) with shapes (k,), (k,), (n, k)
+    """
+    t = np.arange(values.shape[0], dtype=np.float64)
+    observed = ~np.isnan(values)
+    filled = np.where(observed, values, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        counts = observed.sum(axis=0)
+        t_means = (t @ observed) / counts
+        means = filled.sum(axis=0) / counts
+        t_centered = np.where(observed, t[:, None] - t_means, 0.0)
+        slopes = (t_centered * (filled - means)).sum(axis=0) / (t_centered ** 2).sum(axis=0)
+    intercepts = means - slopes * t_means
+    fitted = np.outer(t, slopes) + intercepts
+    return slopes, intercepts, fitted
+
+
+def _r_squared(values, fitted):
+    """Per-column coefficient of determination over observed points, matching sklearn's score()."""
+    ss_res = np.nansum((values - fitted) ** 2, axis=0)
+    ss_tot = np.nansum((values - np.nanmean(values, axis=0)) ** 2, axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r_squared = 1 - ss_res / ss_tot
+    # Constant series: perfect fit scores 1.0, anything else 0.0
+    return np.where(ss_tot > 0, r_squared, np.where(ss_res == 0, 1.0, 0.0))
+
+
 def decompose_timeseries(df, ticker=None):
     """
     Decompose time-series into trend, seasonal, and residual components.
@@ -49,53 +117,50 @@ def decompose_timeseries(df, ticker=None):
     Returns:
         dict with decomposition components for each metric
     """
-    df = _normalize_timeseries_columns(df)
-
-    if ticker:
-        df = df[df['ticker'] == ticker].copy()
-    
-    df = df.sort_values('fiscal_year')
+    df = _company_timeseries(df, ticker)
     
     decomposition_results = {}
-    metrics = ['total_revenue', 'net_profit', 'operating_expenses']
+    metrics = [m for m in ['total_revenue', 'net_profit', 'operating_expenses'] if m in df.columns]
+    n = len(df)
     
-    for metric in metrics:
-        if metric not in df.columns:
-            continue
-            
-        values = df[metric].fillna(0).values
-        n = len(values)
-        
-        if n < 3:  # Need minimum points for decomposition
-            continue
-        
-        # Trend: fit linear regression
-        X = np.arange(n).reshape(-1, 1)
-        model = LinearRegression()
-        model.fit(X, values)
-        trend = model.predict(X)
-        
-        # Detrended values
-        detrended = values - trend
-        
-        # Seasonal: extract repeating pattern (simplified)
-        # For financial data, we look for patterns every 4 quarters or 1 year
-        period = min(4, n // 2)
-        seasonal = np.zeros(n)
-        if period > 1:
-            for i in range(n):
-                seasonal[i] = np.mean([detrended[j] for j in range(i % period, n, period)])
-        
-        # Residual
-        residual = values - trend - seasonal
-        
+    if not metrics or n < 3:  # Need minimum points for decomposition
+        return decomposition_results
+    
+    # Trend: one linear fit for all metrics
+    values_block = df[metrics].fillna(0).to_numpy(dtype=np.float64)
+    _, _, trend_block = _fit_linear_trends(values_block)
+    
+    # Detrended values
+    detrended_block = values_block - trend_block
+    
+    # Seasonal: extract repeating pattern (simplified)
+    # For financial data, we look for patterns every 4 quarters or 1 year
+    period = min(4, n // 2)
+    seasonal_block = np.zeros_like(values_block)
+    if period > 1:
+        # Zero-pad to whole periods, then average each phase over its real rows
+        pad = (-n) % period
+        padded = np.vstack([detrended_block, np.zeros((pad, len(metrics)))])
+        counts = np.r_[np.ones(n), np.zeros(pad)].reshape(-1, period).sum(axis=0)
+        phase_means = padded.reshape(-1, period, len(metrics)).sum(axis=0) / counts[:, None]
+        seasonal_block = np.tile(phase_means, (len(padded) // period, 1))[:n]
+    
+    # Residual
+    residual_block = values_block - trend_block - seasonal_block
+    
+    # Each variance once per metric, reused by both strength ratios
+    residual_var = residual_block.var(axis=0)
+    trend_residual_var = (trend_block + residual_block).var(axis=0)
+    seasonal_residual_var = (seasonal_block + residual_block).var(axis=0)
+    
+    for col, metric in enumerate(metrics):
         decomposition_results[metric] = {
-            'original': values,
-            'trend': trend,
-            'seasonal': seasonal,
-            'residual': residual,
-            'trend_strength': 1 - (np.var(residual) / np.var(trend + residual)) if np.var(trend + residual) > 0 else 0,
-            'seasonal_strength': 1 - (np.var(residual) / np.var(seasonal + residual)) if np.var(seasonal + residual) > 0 else 0
+            'original': values_block[:, col],
+            'trend': trend_block[:, col],
+            'seasonal': seasonal_block[:, col],
+            'residual': residual_block[:, col],
+            'trend_strength': 1 - (residual_var[col] / trend_residual_var[col]) if trend_residual_var[col] > 0 else 0,
+            'seasonal_strength': 1 - (residual_var[col] / seasonal_residual_var[col]) if seasonal_residual_var[col] > 0 else 0
         }
     
     return decomposition_results
@@ -113,12 +178,7 @@ def detect_seasonality(df, ticker=None, period=4):
     Returns:
         dict with seasonality detection results
     """
-    df = _normalize_timeseries_columns(df)
-
-    if ticker:
-        df = df[df['ticker'] == ticker].copy()
-    
-    df = df.sort_values('fiscal_year')
+    df = _company_timeseries(df, ticker)
     
     seasonality_results = {}
     metrics = ['total_revenue', 'net_profit', 'profit_margin']
@@ -129,22 +189,21 @@ def detect_seasonality(df, ticker=None, period=4):
         
         values = df[metric].fillna(0).values
         
-        # Check for regular patterns
-        seasonal_indices = []
-        for i in range(0, len(values) - period):
-            segment = values[i:i+period]
-            seasonal_indices.append(np.std(segment))
+        # Check for regular patterns: std of every length-period window in one call
+        # (windows start at 0..n-period-1; the final window is not included)
+        seasonal_indices = sliding_window_view(values, period)[:-1].std(axis=1)
         
-        avg_volatility = np.mean(seasonal_indices) if seasonal_indices else 0
+        avg_volatility = np.mean(seasonal_indices) if len(seasonal_indices) else 0
+        overall_std = np.std(values)
         
         # Detect if pattern repeats
-        is_seasonal = avg_volatility > np.std(values) * 0.5 if np.std(values) > 0 else False
+        is_seasonal = avg_volatility > overall_std * 0.5 if overall_std > 0 else False
         
         seasonality_results[metric] = {
             'is_seasonal': is_seasonal,
             'volatility': avg_volatility,
-            'overall_std': np.std(values),
-            'pattern_strength': avg_volatility / (np.std(values) + 1e-10)
+            'overall_std': overall_std,
+            'pattern_strength': avg_volatility / (overall_std + 1e-10)
         }
     
     return seasonality_results
@@ -161,37 +220,28 @@ def identify_growth_periods(df, ticker=None):
     Returns:
         dict with period classifications
     """
-    df = _normalize_timeseries_columns(df)
-
-    if ticker:
-        df = df[df['ticker'] == ticker].copy()
+    df = _company_timeseries(df, ticker)
     
-    df = df.sort_values('fiscal_year')
-    
-    periods = []
     years = df['fiscal_year'].values
     revenues = df['total_revenue'].fillna(0).values
     
-    for i in range(1, len(revenues)):
-        yoy_growth = ((revenues[i] - revenues[i-1]) / (revenues[i-1] + 1e-10)) * 100
-        
-        if abs(revenues[i]) < 1e-10:
-            period_type = "No data"
-        elif yoy_growth > 10:
-            period_type = "Strong growth"
-        elif yoy_growth > 0:
-            period_type = "Moderate growth"
-        elif yoy_growth > -5:
-            period_type = "Stable/slight decline"
-        else:
-            period_type = "Significant decline"
-        
-        periods.append({
-            'year': years[i],
-            'prev_year': years[i-1],
-            'yoy_growth_pct': yoy_growth,
+    # Classify every year-over-year step at once
+    yoy_growth = ((revenues[1:] - revenues[:-1]) / (revenues[:-1] + 1e-10)) * 100
+    period_types = np.select(
+        [np.abs(revenues[1:]) < 1e-10, yoy_growth > 10, yoy_growth > 0, yoy_growth > -5],
+        ["No data", "Strong growth", "Moderate growth", "Stable/slight decline"],
+        default="Significant decline",
+    ).tolist()
+    
+    periods = [
+        {
+            'year': year,
+            'prev_year': prev_year,
+            'yoy_growth_pct': growth,
             'period_type': period_type
-        })
+        }
+        for year, prev_year, growth, period_type in zip(years[1:], years[:-1], yoy_growth, period_types)
+    ]
     
     return periods
 
@@ -207,40 +257,79 @@ def calculate_trend_slope(df, ticker=None):
     Returns:
         dict with trend slopes for each metric
     """
-    df = _normalize_timeseries_columns(df)
-
-    if ticker:
-        df = df[df['ticker'] == ticker].copy()
-    
-    df = df.sort_values('fiscal_year')
+    df = _company_timeseries(df, ticker)
     
     trend_slopes = {}
-    metrics = ['total_revenue', 'net_profit', 'operating_expenses', 'profit_margin']
+    metrics = [m for m in ['total_revenue', 'net_profit', 'operating_expenses', 'profit_margin'] if m in df.columns]
     
-    for metric in metrics:
-        if metric not in df.columns or len(df) < 2:
+    if not metrics or len(df) < 2:
+        return trend_slopes
+    
+    # Fit every metric in one closed-form solve; missing years are skipped
+    # rather than zero-filled, which would drag the slope toward zero
+    values = df[metrics].to_numpy(dtype=np.float64)
+    slopes, intercepts, fitted = _fit_linear_trends(values)
+    r_squared = _r_squared(values, fitted)
+    observed_counts = (~np.isnan(values)).sum(axis=0)
+    
+    for j, metric in enumerate(metrics):
+        if observed_counts[j] < 2:
             continue
         
-        X = np.arange(len(df)).reshape(-1, 1)
-        y = df[metric].fillna(0).values
-        
-        model = LinearRegression()
-        model.fit(X, y)
-        
         trend_slopes[metric] = {
-            'slope': model.coef_[0],
-            'intercept': model.intercept_,
-            'slope_interpretation': "increasing" if model.coef_[0] > 0 else "decreasing",
-            'r_squared': model.score(X, y)
+            'slope': slopes[j],
+            'intercept': intercepts[j],
+            'slope_interpretation': "increasing" if slopes[j] > 0 else "decreasing",
+            'r_squared': r_squared[j]
         }
     
     return trend_slopes
 
 
-def run_timeseries_analysis():
+def _results_cache_path(df):
+    """Cache file for the analysis of df, keyed by its contents and schema."""
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(f"v{_CACHE_VERSION}|{list(df.columns)}|{list(df.dtypes.astype(str))}".encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return os.path.join(CACHE_DIR, f"ts_analysis_{digest.hexdigest()}.pkl")
+
+
+def _load_cached_results(path):
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+
+
+def _save_cached_results(path, results):
+    """Save results as the only cached analysis; entries for older data are pruned."""
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(results, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except (OSError, pickle.PicklingError) as e:
+        print(f"⚠ Could not cache time-series results: {e}")
+        return
+    for stale in glob.glob(os.path.join(CACHE_DIR, "ts_analysis_*.pkl")):
+        if os.path.abspath(stale) != os.path.abspath(path):
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+
+
+def run_timeseries_analysis(use_cache=True, data=None):
     """
     Execute complete time-series analysis.
     
+    Args:
+        use_cache: Reuse results saved for identical input data, if any
+        data: (standard_df, category_df, merged_df) from get_analysis_data(), of which only
+            standard_df is used; fetched when omitted, so callers can share one load
+        
     Returns:
         dict with all analysis results
     """
@@ -251,7 +340,7 @@ def run_timeseries_analysis():
     # Load data
     print("\n[1/4] Loading time-series data...")
     try:
-        df = get_standard_table_data()
+        df = data[0] if data is not None else get_standard_table_data()
         print(f"✓ Data loaded: {len(df)} records")
         companies = df['ticker'].unique()
         print(f"✓ Companies: {', '.join(companies)}")
@@ -259,30 +348,49 @@ def run_timeseries_analysis():
         print(f"✗ Error loading data: {e}")
         return None
     
+    cache_path = _results_cache_path(df)
+    if use_cache:
+        cached = _load_cached_results(cache_path)
+        if cached is not None:
+            print(f"✓ Unchanged data; loaded cached results from {cache_path}")
+            return cached
+    
+    # Normalize once and split by company; each step then reuses the same ordered slices
+    normalized = _normalize_timeseries_columns(df)
+    by_ticker = {
+        company: _company_timeseries(group)
+        for company, group in normalized.groupby('ticker', sort=False, observed=True)
+    }
+    
+    # Any step that fails leaves partial results, which must not be cached
+    failed = False
+    
     # Decompose time-series
     print("\n[2/4] Decomposing time-series by company...")
     decomposition_by_company = {}
     try:
         for company in companies:
-            decomp = decompose_timeseries(df, ticker=company)
+            decomp = decompose_timeseries(by_ticker[company])
             decomposition_by_company[company] = decomp
             print(f"✓ {company}: Decomposed {len(decomp)} metrics")
             for metric, result in decomp.items():
                 print(f"  - {metric}: trend_strength={result['trend_strength']:.3f}, seasonal_strength={result['seasonal_strength']:.3f}")
     except Exception as e:
         print(f"✗ Error in decomposition: {e}")
+        failed = True
     
     # Detect seasonality
     print("\n[3/4] Detecting seasonality patterns...")
     seasonality_by_company = {}
     try:
         for company in companies:
-            seasonality = detect_seasonality(df, ticker=company)
+            seasonality = detect_seasonality(by_ticker[company])
             seasonality_by_company[company] = seasonality
             seasonal_count = sum(1 for v in seasonality.values() if v['is_seasonal'])
             print(f"✓ {company}: Seasonal patterns detected in {seasonal_count}/{len(seasonality)} metrics")
     except Exception as e:
         print(f"✗ Error in seasonality detection: {e}")
+        failed = True
     
     # Identify growth periods and trend slopes
     print("\n[4/4] Identifying growth periods and trend slopes...")
@@ -290,8 +398,8 @@ def run_timeseries_analysis():
     trend_slopes_by_company = {}
     try:
         for company in companies:
-            growth = identify_growth_periods(df, ticker=company)
-            trends = calculate_trend_slope(df, ticker=company)
+            growth = identify_growth_periods(by_ticker[company])
+            trends = calculate_trend_slope(by_ticker[company])
             
             growth_periods_by_company[company] = growth
             trend_slopes_by_company[company] = trends
@@ -304,14 +412,19 @@ def run_timeseries_analysis():
                 print(f"    * {metric}: {trend['slope_interpretation']} (slope={trend['slope']:.2f})")
     except Exception as e:
         print(f"✗ Error in growth analysis: {e}")
+        failed = True
     
-    return {
+    results = {
         'raw_data': df,
         'decomposition_results': decomposition_by_company,
         'seasonality_results': seasonality_by_company,
         'growth_periods': growth_periods_by_company,
         'trend_slopes': trend_slopes_by_company
     }
+    if not failed:
+        _save_cached_results(cache_path, results)
+    
+    return results
 
 
 if __name__ == "__main__":
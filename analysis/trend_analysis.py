@@ -3,7 +3,37 @@
 
 import pandas as pd
 import numpy as np
-from .data_connection import get_standard_table_data, get_company_data
+from numba import njit
+from .data_connection import get_standard_table_data, get_company_data, sorted_by_ticker_date
+
+
+@njit(cache=True)
+def _masked_slope(y):
+    """(non-NaN count, least-squares slope vs position, mean) over the non-NaN values."""
+    n_valid = 0
+    x_sum = 0.0
+    y_sum = 0.0
+    for i in range(y.shape[0]):
+        if not np.isnan(y[i]):
+            n_valid += 1
+            x_sum += i
+            y_sum += y[i]
+    if n_valid < 2:
+        return n_valid, np.nan, np.nan
+    x_mean = x_sum / n_valid
+    y_mean = y_sum / n_valid
+    sxy = 0.0
+    sxx = 0.0
+    for i in range(y.shape[0]):
+        if not np.isnan(y[i]):
+            dx = i - x_mean
+            sxy += dx * (y[i] - y_mean)
+            sxx += dx * dx
+    return n_valid, sxy / sxx, y_mean
+
+
+# Pay the JIT compile cost at import rather than on the first report
+_masked_slope(np.zeros(2))
 
 
 def analyze_trends(ticker=None):
@@ -13,11 +43,10 @@ def analyze_trends(ticker=None):
     print("=" * 60)
     
     df = get_company_data(ticker) if ticker else get_standard_table_data()
-    companies = [ticker] if ticker else sorted(df['ticker'].unique())
     
     trends_report = {}
-    for company in companies:
-        data = df[df['ticker'] == company].sort_values('date')
+    # One groupby over (ticker, date)-ordered rows instead of a full-frame mask and sort per company
+    for company, data in sorted_by_ticker_date(df).groupby('ticker', observed=True):
         if len(data) < 2:
             continue
         
@@ -25,9 +54,9 @@ def analyze_trends(ticker=None):
             'revenue_trend': classify_trend(data['revenue'].values),
             'profit_trend': classify_trend(data['net_income'].values),
             'growth_trend': classify_trend(data['revenue_growth'].dropna().values),
-            'latest_year': data['date'].iloc[-1].year,
-            'revenue_latest': data['revenue'].iloc[-1],
-            'profit_latest': data['net_income'].iloc[-1],
+            'latest_year': data['date'].iat[-1].year,
+            'revenue_latest': data['revenue'].iat[-1],
+            'profit_latest': data['net_income'].iat[-1],
         }
         
         t = trends_report[company]
@@ -51,22 +80,12 @@ def classify_trend(values):
     if len(values) < 2:
         return "Insufficient Data"
     
-    # Calculate simple linear regression
-    x = np.arange(len(values))
-    y = np.array(values)
-    
-    # Remove NaN values
-    mask = ~np.isnan(y)
-    if np.sum(mask) < 2:
+    # Simple linear regression over the non-NaN values
+    n_valid, slope, mean_val = _masked_slope(np.asarray(values, dtype=np.float64))
+    if n_valid < 2:
         return "Insufficient Data"
     
-    x_clean = x[mask]
-    y_clean = y[mask]
-    
-    slope = np.polyfit(x_clean, y_clean, 1)[0]
-    
     # Determine trend based on slope and volatility
-    mean_val = np.mean(y_clean)
     if mean_val == 0:
         return "Neutral"
     
@@ -91,11 +110,9 @@ def calculate_ratios(ticker=None):
     print("=" * 60)
     
     df = get_company_data(ticker) if ticker else get_standard_table_data()
-    companies = [ticker] if ticker else sorted(df['ticker'].unique())
     
     ratios_report = {}
-    for company in companies:
-        company_data = df[df['ticker'] == company].sort_values('date')
+    for company, company_data in sorted_by_ticker_date(df).groupby('ticker', observed=True):
         ratios = {'ticker': company, **calculate_ratio_metrics(company_data)}
         ratios_report[company] = ratios
         print_ratio_summary(company, ratios)
@@ -105,27 +122,34 @@ def calculate_ratios(ticker=None):
 
 def calculate_ratio_metrics(company_data):
     """Calculate all ratio types in one pass."""
+    # Plain arrays for the first/latest lookups; avoids .iloc's indexer per access
+    profit_margin = company_data['profit_margin'].to_numpy()
+    operating_margin = company_data['operating_margin'].to_numpy()
+    asset_efficiency = company_data['asset_efficiency'].to_numpy()
+    debt_to_asset = company_data['debt_to_asset'].to_numpy()
+    operating_cashflow = company_data['operating_cashflow'].to_numpy()
+    
     # Profitability
     profitability = {
         'profit_margin_avg': company_data['profit_margin'].mean(),
-        'profit_margin_latest': company_data['profit_margin'].iloc[-1],
+        'profit_margin_latest': profit_margin[-1],
         'operating_margin_avg': company_data['operating_margin'].mean(),
-        'operating_margin_latest': company_data['operating_margin'].iloc[-1],
+        'operating_margin_latest': operating_margin[-1],
     }
     
     # Efficiency
     efficiency = {
         'asset_efficiency_avg': company_data['asset_efficiency'].mean(),
-        'asset_efficiency_latest': company_data['asset_efficiency'].iloc[-1],
-        'asset_turnover_trend': company_data['asset_efficiency'].iloc[-1] - company_data['asset_efficiency'].iloc[0],
+        'asset_efficiency_latest': asset_efficiency[-1],
+        'asset_turnover_trend': asset_efficiency[-1] - asset_efficiency[0],
     }
     
     # Leverage
     leverage = {
         'debt_to_asset_avg': company_data['debt_to_asset'].mean(),
-        'debt_to_asset_latest': company_data['debt_to_asset'].iloc[-1],
-        'debt_to_asset_improvement': company_data['debt_to_asset'].iloc[0] - company_data['debt_to_asset'].iloc[-1],
-        'equity_to_asset_latest': 1 - company_data['debt_to_asset'].iloc[-1],
+        'debt_to_asset_latest': debt_to_asset[-1],
+        'debt_to_asset_improvement': debt_to_asset[0] - debt_to_asset[-1],
+        'equity_to_asset_latest': 1 - debt_to_asset[-1],
     }
     
     # Cash flow
@@ -135,7 +159,7 @@ def calculate_ratio_metrics(company_data):
         'total_cashflow': total_cashflow,
         'avg_annual_cashflow': company_data['operating_cashflow'].mean(),
         'cashflow_to_revenue': (total_cashflow / total_revenue) * 100 if total_revenue > 0 else 0,
-        'latest_year_cashflow': company_data['operating_cashflow'].iloc[-1],
+        'latest_year_cashflow': operating_cashflow[-1],
     }
     
     return {
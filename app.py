@@ -9,6 +9,7 @@ import os
 from pathlib import Path
 
 import numpy as np
+import orjson
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
@@ -228,13 +229,67 @@ def load_data(path: str) -> pd.DataFrame:
     if not p.exists():
         st.error(f"Data file not found: {path}")
         return pd.DataFrame()
-    with p.open("r", encoding="utf-8") as f:
-        data = json.load(f)
-    df = pd.DataFrame(data)
-    df["date"] = pd.to_datetime(df["date"])
+    # Keyed on mtime so a re-extracted file is picked up without a restart
+    return _read_data_file(str(p), p.stat().st_mtime)
+
+
+@st.cache_data(show_spinner=False)
+def _read_data_file(path: str, mtime: float) -> pd.DataFrame:
+    p = Path(path)
+    parquet_path = p.with_suffix(".parquet")
+    df = None
+    # A parquet sidecar at least as new as the JSON skips the JSON parse entirely
+    try:
+        if parquet_path.stat().st_mtime >= mtime:
+            df = pd.read_parquet(parquet_path)
+    except Exception:
+        pass
+    if df is None:
+        raw = p.read_bytes()
+        data = orjson.loads(raw)
+        df = pd.DataFrame(data)
+        df["date"] = pd.to_datetime(df["date"])
+        try:
+            df.to_parquet(parquet_path, index=False)
+        except Exception:
+            pass  # The sidecar is an optimization only
+    # Fiscal year is read by the slider and every filter; extract it once
+    year = df["date"].dt.year
+    df["year"] = year.astype("int16") if year.notna().all() else year
+    # Display-only copy: float32 (~7 significant digits) is ample for charts and
+    # $M tiles and halves the bytes every filter/groupby/plot touches.
+    float_cols = df.select_dtypes("float64").columns
+    df[float_cols] = df[float_cols].astype("float32")
     return df
 
 
+def filter_dashboard_data(path: str, tickers, year_range) -> pd.DataFrame:
+    """Dashboard rows for the sidebar selection, with derived ratio columns."""
+    p = Path(path)
+    return _filter_dashboard_data(
+        str(p), p.stat().st_mtime, tuple(tickers), tuple(year_range)
+    )
+
+
+@st.cache_data(show_spinner=False)
+def _filter_dashboard_data(path: str, mtime: float, tickers: tuple, year_range: tuple) -> pd.DataFrame:
+    # Cached per selection, so widget changes elsewhere skip the filter/derive work
+    df = _read_data_file(path, mtime)
+    mask = df["ticker"].isin(tickers) & df["year"].between(year_range[0], year_range[1])
+    filtered = df.loc[mask].copy()
+
+    if "operating_expenses" not in filtered.columns:
+        filtered["operating_expenses"] = (
+            filtered["revenue"] - filtered["operating_income"]
+        ).clip(lower=0)
+
+    filtered["profit_margin"] = filtered["net_income"] / filtered["revenue"].replace(0, pd.NA)
+    filtered["debt_ratio"] = (
+        filtered["total_liabilities"] / filtered["total_assets"].replace(0, pd.NA)
+    )
+    return filtered
+
+
 @st.cache_data
 def load_svr_predictions() -> dict:
     reports_path = Path("analysis/reports")
@@ -751,8 +806,8 @@ with st.sidebar:
             selected_tickers = st.multiselect(
                 "Company", tickers_available, default=tickers_available
             )
-            min_year = int(_df_raw["date"].dt.year.min())
-            max_year = int(_df_raw["date"].dt.year.max())
+            min_year = int(_df_raw["year"].min())
+            max_year = int(_df_raw["year"].max())
             year_range = st.slider(
                 "Year Range", min_year, max_year,
                 (max(min_year, 2015), max_year),
@@ -879,7 +934,7 @@ if page == "📊 Dashboard":
     # Apply sidebar filters (defined above in sidebar block)
     if "selected_tickers" not in dir():
         selected_tickers = sorted(df["ticker"].dropna().unique().tolist())
-        year_range = (int(df["date"].dt.year.min()), int(df["date"].dt.year.max()))
+        year_range = (int(df["year"].min()), int(df["year"].max()))
         data_source = "Internal"
         metric_choice = "Revenue"
 
@@ -887,26 +942,12 @@ if page == "📊 Dashboard":
         st.warning("Select at least one company to render the dashboard.")
         st.stop()
 
-    filtered = df[df["ticker"].isin(selected_tickers)].copy()
-    filtered = filtered[
-        (filtered["date"].dt.year >= year_range[0])
-        & (filtered["date"].dt.year <= year_range[1])
-    ]
-
-    if "operating_expenses" not in filtered.columns:
-        filtered["operating_expenses"] = (
-            filtered["revenue"] - filtered["operating_income"]
-        ).clip(lower=0)
+    filtered = filter_dashboard_data(data_path, selected_tickers, year_range)
 
     if filtered.empty:
         st.warning("No records found for selected filters.")
         st.stop()
 
-    filtered["profit_margin"] = filtered["net_income"] / filtered["revenue"].replace(0, pd.NA)
-    filtered["debt_ratio"] = (
-        filtered["total_liabilities"] / filtered["total_assets"].replace(0, pd.NA)
-    )
-
     tab_historical, tab_predictions, tab_explainability = st.tabs(
         ["📊 Historical Analysis", "🎯 SVR Predictions", "🔍 SHAP Explainability"]
     )
@@ -943,6 +984,12 @@ if page == "📊 Dashboard":
         st.plotly_chart(line_fig, use_container_width=True)
         st.markdown("</div>", unsafe_allow_html=True)
 
+        # One grouped pass feeds all three comparison charts below
+        ticker_totals = filtered.groupby("ticker", as_index=False)[
+            ["revenue", "operating_expenses", "total_assets",
+             "total_liabilities", "operating_cashflow", "net_income"]
+        ].sum()
+
         b1, b2, b3 = st.columns(3, gap="medium")
 
         with b1:
@@ -951,16 +998,11 @@ if page == "📊 Dashboard":
                 "<div class='section-title'>Revenue vs Expenses</div>",
                 unsafe_allow_html=True,
             )
-            rev_exp = (
-                filtered.groupby("ticker", as_index=False)[
-                    ["revenue", "operating_expenses"]
-                ].sum()
-                .melt(
-                    id_vars="ticker",
-                    value_vars=["revenue", "operating_expenses"],
-                    var_name="metric",
-                    value_name="value",
-                )
+            rev_exp = ticker_totals.melt(
+                id_vars="ticker",
+                value_vars=["revenue", "operating_expenses"],
+                var_name="metric",
+                value_name="value",
             )
             fig_rev_exp = px.bar(
                 rev_exp, x="ticker", y="value", color="metric",
@@ -979,16 +1021,11 @@ if page == "📊 Dashboard":
                 "<div class='section-title'>Assets vs Liabilities</div>",
                 unsafe_allow_html=True,
             )
-            ass_liab = (
-                filtered.groupby("ticker", as_index=False)[
-                    ["total_assets", "total_liabilities"]
-                ].sum()
-                .melt(
-                    id_vars="ticker",
-                    value_vars=["total_assets", "total_liabilities"],
-                    var_name="metric",
-                    value_name="value",
-                )
+            ass_liab = ticker_totals.melt(
+                id_vars="ticker",
+                value_vars=["total_assets", "total_liabilities"],
+                var_name="metric",
+                value_name="value",
             )
             fig_ass_liab = px.bar(
                 ass_liab, x="ticker", y="value", color="metric",
@@ -1007,16 +1044,11 @@ if page == "📊 Dashboard":
                 "<div class='section-title'>Cashflow vs Income</div>",
                 unsafe_allow_html=True,
             )
-            cf_income = (
-                filtered.groupby("ticker", as_index=False)[
-                    ["operating_cashflow", "net_income"]
-                ].sum()
-                .melt(
-                    id_vars="ticker",
-                    value_vars=["operating_cashflow", "net_income"],
-                    var_name="metric",
-                    value_name="value",
-                )
+            cf_income = ticker_totals.melt(
+                id_vars="ticker",
+                value_vars=["operating_cashflow", "net_income"],
+                var_name="metric",
+                value_name="value",
             )
             fig_cf = px.bar(
                 cf_income, x="ticker", y="value", color="metric",
@@ -1071,8 +1103,7 @@ if page == "📊 Dashboard":
             )
             table = filtered.sort_values(
                 ["date", "ticker"], ascending=[False, True]
-            ).copy()
-            table["year"] = table["date"].dt.year
+            )
             table = table[
                 ["year", "ticker", "revenue", "net_income",
                  "operating_expenses", "total_assets",
@@ -53,7 +53,10 @@ def logout():
         _get_client().auth.sign_out()
     except Exception:
         pass
-    for key in ["user", "session", "user_id", "user_email", "recommendations"]:
+    for key in [
+        "user", "session", "user_id", "user_email", "recommendations",
+        "_supabase_client", "_supabase_client_token",
+    ]:
         st.session_state.pop(key, None)
 
 
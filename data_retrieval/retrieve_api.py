@@ -6,11 +6,20 @@ into data/raw without modifying the ETL pipeline.
 """
 
 import os
-import json
-import requests
+import time
+import threading
+import httpx
+import orjson
 import streamlit as st
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+try:
+    import h2  # noqa: F401
+    _HTTP2 = True
+except ImportError:  # HTTP/2 needs the optional h2 package; HTTP/1.1 keep-alive otherwise
+    _HTTP2 = False
+
 
 def get_secret(key, default=None):
     try:
@@ -32,15 +41,88 @@ if not API_KEY:
     )
 
 
+# Raw API responses are memoized on disk so reruns skip the network
+# (and Alpha Vantage's per-minute rate limit) for a day.
+CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "data", "cache", "alphavantage"
+)
+CACHE_TTL_SECONDS = 24 * 60 * 60
+
+# One pooled client shared by the fetch threads, so requests reuse open
+# connections instead of a fresh TCP/TLS handshake per statement.
+_CLIENT = None
+_CLIENT_LOCK = threading.Lock()
+_HTTP_LIMITS = httpx.Limits(max_connections=16, max_keepalive_connections=8)
+
+
+def _get_http_client():
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            _CLIENT = httpx.Client(http2=_HTTP2, limits=_HTTP_LIMITS, timeout=30.0)
+        return _CLIENT
+
+
 # -----------------------------
-# API fetch helper
+# Response cache
 # -----------------------------
-def fetch_statement(symbol: str, function_name: str):
-    url = f"{BASE_URL}?function={function_name}&symbol={symbol}&apikey={API_KEY}"
-    response = requests.get(url)
+def _cache_path(symbol: str, function_name: str):
+    return os.path.join(CACHE_DIR, f"{function_name}_{symbol}.json")
+
+
+def _dump_json(data, f, indent=None):
+    """Write data to binary file f, serialized with orjson."""
+    f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0))
+
+
+def _load_cached_response(path):
+    try:
+        if time.time() - os.path.getmtime(path) > CACHE_TTL_SECONDS:
+            return None
+        with open(path, "rb") as f:
+            raw = f.read()
+        return orjson.loads(raw)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_cached_response(path, data):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        _dump_json(data, f)
+    os.replace(tmp_path, path)
+
+
+def fetch_response(symbol: str, function_name: str, use_cache: bool = True):
+    """Return the decoded API response, served from the disk cache when fresh."""
+    path = _cache_path(symbol, function_name)
+    if use_cache:
+        cached = _load_cached_response(path)
+        if cached is not None:
+            return cached
+
+    response = _get_http_client().get(
+        BASE_URL,
+        params={"function": function_name, "symbol": symbol, "apikey": API_KEY}
+    )
     response.raise_for_status()
     data = response.json()
 
+    # Only cache real statements; rate-limit notes and errors must be retried
+    if "annualReports" in data or "quarterlyReports" in data:
+        _save_cached_response(path, data)
+
+    return data
+
+
+# -----------------------------
+# API fetch helper
+# -----------------------------
+def fetch_statement(symbol: str, function_name: str, use_cache: bool = True):
+    data = fetch_response(symbol, function_name, use_cache=use_cache)
+
     annual = data.get("annualReports", [])
     quarterly = data.get("quarterlyReports", [])
 
@@ -60,26 +142,33 @@ def fetch_statement(symbol: str, function_name: str):
 # -----------------------------
 # Merge financial statements
 # -----------------------------
-def merge_financials(symbol: str):
-    income = fetch_statement(symbol, "INCOME_STATEMENT")
-    balance = fetch_statement(symbol, "BALANCE_SHEET")
-    cashflow = fetch_statement(symbol, "CASH_FLOW")
+STATEMENT_FUNCTIONS = ("INCOME_STATEMENT", "BALANCE_SHEET", "CASH_FLOW")
+
+
+def merge_financials(symbol: str, use_cache: bool = True):
+    # The three statements are independent requests; issue them concurrently
+    with ThreadPoolExecutor(max_workers=len(STATEMENT_FUNCTIONS)) as pool:
+        income, balance, cashflow = pool.map(
+            lambda function_name: fetch_statement(symbol, function_name, use_cache=use_cache),
+            STATEMENT_FUNCTIONS
+        )
 
     def index_by_year(records):
         return {r["fiscalDateEnding"]: r for r in records}
 
-    inc_map = index_by_year(income)
     bal_map = index_by_year(balance)
     cf_map = index_by_year(cashflow)
 
-    years = set(inc_map) & set(bal_map) & set(cf_map)
-
     merged = []
 
-    for year in sorted(years):
-        inc = inc_map[year]
-        bal = bal_map[year]
-        cf = cf_map[year]
+    # Single pass over the income records, probing the other two statements;
+    # fetch_statement has already de-duplicated fiscalDateEnding.
+    for inc in sorted(income, key=lambda r: r["fiscalDateEnding"]):
+        year = inc["fiscalDateEnding"]
+        bal = bal_map.get(year)
+        cf = cf_map.get(year)
+        if bal is None or cf is None:
+            continue
 
         record = {
             "date": year,
@@ -113,8 +202,8 @@ def save_raw_data(records, filename="financial_data_raw.json"):
 
     path = os.path.join(raw_dir, filename)
 
-    with open(path, "w") as f:
-        json.dump(records, f, indent=2)
+    with open(path, "wb") as f:
+        _dump_json(records, f, indent=2)
 
     print(f"Saved {len(records)} records to {path}")
     return path
@@ -123,19 +212,26 @@ def save_raw_data(records, filename="financial_data_raw.json"):
 # -----------------------------
 # Main execution
 # -----------------------------
-def fetch_and_store(symbols=None):
+def _fetch_symbol(sym, use_cache=True):
+    print(f"Fetching financials for {sym}...")
+    try:
+        return merge_financials(sym, use_cache=use_cache)
+    except Exception as e:
+        print(f"Error fetching {sym}: {e}")
+        return []
+
+
+def fetch_and_store(symbols=None, max_workers=8, use_cache=True):
     if symbols is None:
         symbols = ["AAPL", "MSFT", "GOOGL", "AMZN", "TSLA"]
 
     all_data = []
 
-    for sym in symbols:
-        print(f"Fetching financials for {sym}...")
-        try:
-            merged = merge_financials(sym)
+    # Requests are network-bound, so threads overlap the round-trips;
+    # map() keeps the records in symbol order.
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for merged in pool.map(lambda sym: _fetch_symbol(sym, use_cache), symbols):
             all_data.extend(merged)
-        except Exception as e:
-            print(f"Error fetching {sym}: {e}")
 
     return save_raw_data(all_data)
 
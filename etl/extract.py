@@ -4,6 +4,7 @@ import json
 import os
 from abc import ABC, abstractmethod
 
+import orjson
 import pandas as pd
 
 
@@ -70,8 +71,9 @@ def extract_data(source_type="api", source_path=None):
     df = extractor.extract(input_path)
 
     records = df.to_dict("records")
-    with open(default_raw, "w", encoding="utf-8") as f:
-        json.dump(records, f, indent=2)
+    # C serializer; NaN is written as null instead of the non-standard NaN token
+    with open(default_raw, "wb") as f:
+        f.write(orjson.dumps(records, option=orjson.OPT_INDENT_2))
 
     print(f"Data extracted and saved to {default_raw}")
     print(f"Total records extracted: {len(records)}")
@@ -108,34 +108,33 @@ def build_direct_standard_and_category_records(
 
     std = std.sort_values(["ticker", "date"], kind="stable").reset_index(drop=True)
 
+    # Category inputs come from the typed frame, which is already in
+    # (ticker, date) order, so there is nothing to re-parse or re-sort.
+    revenue_growth = std.groupby("ticker")["revenue"].pct_change() * 100
+    debt_to_asset = std["total_liabilities"] / (std["total_assets"] + 1e-9)
+
     # Convert dates back to string for JSON-style records consumed downstream.
     std["date"] = std["date"].dt.strftime("%Y-%m-%d")
 
     standard_records = std.where(pd.notnull(std), None).to_dict(orient="records")
 
     # Build category rows with deterministic defaults/classification.
-    calc = std.copy()
-    calc["date_dt"] = pd.to_datetime(calc["date"], errors="coerce")
-    calc = calc.sort_values(["ticker", "date_dt"], kind="stable")
-    calc["revenue_growth"] = calc.groupby("ticker")["revenue"].pct_change() * 100
-    calc["debt_to_asset"] = calc["total_liabilities"] / (calc["total_assets"] + 1e-9)
-
-    category = calc[["ticker", "date", "revenue", "operating_income", "net_income"]].copy()
+    category = std[["ticker", "date", "revenue", "operating_income", "net_income"]].copy()
     category["sector"] = "Unknown"
     category["category"] = np.select(
         [
-            calc["revenue_growth"] > 10,
-            (calc["revenue_growth"] > 0) & (calc["revenue_growth"] <= 10),
-            calc["revenue_growth"].notna(),
+            revenue_growth > 10,
+            (revenue_growth > 0) & (revenue_growth <= 10),
+            revenue_growth.notna(),
         ],
         ["High Growth", "Moderate Growth", "Stable"],
         default="Unknown",
     )
     category["risk_level"] = np.select(
         [
-            calc["debt_to_asset"] > 0.7,
-            (calc["debt_to_asset"] > 0.4) & (calc["debt_to_asset"] <= 0.7),
-            calc["debt_to_asset"].notna(),
+            debt_to_asset > 0.7,
+            (debt_to_asset > 0.4) & (debt_to_asset <= 0.7),
+            debt_to_asset.notna(),
         ],
         ["High Risk", "Medium Risk", "Low Risk"],
         default="Unknown",
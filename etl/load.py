@@ -1,19 +1,74 @@
 """ETL load layer for Supabase/PostgreSQL."""
 
 import os
+import csv
 import hashlib
 import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
+import httpx
 import numpy as np
 import pandas as pd
-from supabase import create_client
+from postgrest.types import ReturnMethod
+from supabase import ClientOptions, create_client
+
+try:
+    import psycopg
+    from psycopg import sql
+except ImportError:  # psycopg is optional; fall back to REST batch upserts
+    psycopg = sql = None
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; staged CSVs are read instead
+    pq = None
 
 from config import get_secret
 
 BATCH_SIZE = 100
+# Batches are network-bound, so keep several requests in flight at once.
+MAX_INFLIGHT_BATCHES = 8
+COPY_CHUNK_BYTES = 1 << 20
+# Staged files are read this many rows at a time, so memory stays bounded.
+STAGE_CHUNK_ROWS = 10_000
+# Enough keep-alive connections for every in-flight batch to reuse one.
+_HTTP_LIMITS = httpx.Limits(
+    max_connections=2 * MAX_INFLIGHT_BATCHES,
+    max_keepalive_connections=MAX_INFLIGHT_BATCHES,
+)
+
+# Staged column types, per create_tables.sql (TEXT -> string, FLOAT -> float64).
+# Naming them skips the CSV parser's type inference and keeps dates as the
+# ISO text the tables store.
+STAGED_DTYPES = {
+    **dict.fromkeys(
+        ["date", "ticker", "sector", "category", "risk_level", "user_id"], "string"
+    ),
+    **dict.fromkeys(
+        [
+            "revenue", "operating_income", "net_income", "operating_cashflow",
+            "total_assets", "total_liabilities", "profit_margin", "operating_margin",
+            "revenue_growth", "net_income_growth", "asset_efficiency", "debt_to_asset",
+        ],
+        "float64",
+    ),
+}
+
+
+def _create_pooled_client(url, key):
+    """Build a client backed by a keep-alive httpx connection pool."""
+    try:
+        options = ClientOptions(httpx_client=httpx.Client(limits=_HTTP_LIMITS))
+    except TypeError:
+        # Older supabase-py releases do not accept a custom httpx client.
+        return create_client(url, key)
+    return create_client(url, key, options=options)
 
 
+@lru_cache(maxsize=1)
 def get_supabase_client():
+    """Process-wide client, so every load reuses one connection pool."""
     url = get_secret("SUPABASE_URL")
     key = get_secret("SUPABASE_KEY")
 
@@ -22,13 +77,15 @@ def get_supabase_client():
             "SUPABASE_URL and SUPABASE_KEY are not configured"
         )
 
-    return create_client(url, key)
+    return _create_pooled_client(url, key)
 
 
+@lru_cache(maxsize=1)
 def get_supabase_admin_client():
     """
     Returns Supabase client with service role key for backend operations.
     Bypasses RLS, allowing inserts with specific user_id values.
+    The client is shared process-wide; it never carries a user session.
     """
     url = get_secret("SUPABASE_URL")
 
@@ -41,44 +98,113 @@ def get_supabase_admin_client():
             "SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY is not configured"
         )
 
-    return create_client(
-        url,
-        service_key
-    )
+    return _create_pooled_client(url, service_key)
+
+
+def _json_records(df: pd.DataFrame) -> list[dict]:
+    """
+    Rows as dicts with NaN, NaT and ±inf all sent as None, since JSON has no
+    NaN or infinity. Float columns can't hold None, so values go through
+    object dtype; the ±inf check only scans the numeric columns.
+    """
+    missing = df.isna().to_numpy()
+    num_cols = df.columns.get_indexer(df.select_dtypes(include="number").columns)
+    if len(num_cols):
+        numeric = df.iloc[:, num_cols].to_numpy(dtype=float, na_value=np.nan)
+        missing[:, num_cols] |= np.isinf(numeric)
+    values = df.astype(object).mask(missing, None)
+    # zip over plain tuples skips to_dict's per-row dtype boxing
+    columns = values.columns.tolist()
+    return [dict(zip(columns, row)) for row in values.itertuples(index=False, name=None)]
 
 
 def _df_to_records(df: pd.DataFrame) -> list[dict]:
-    data = df.copy()
-    for col in data.select_dtypes(
-        include=["datetime64[ns]", "datetime64[ns, UTC]"]
-    ):
-        data[col] = data[col].astype(str)
-    data = data.where(pd.notnull(data), other=None)
-    return data.to_dict(orient="records")
+    date_cols = df.select_dtypes(include=["datetime64[ns]", "datetime64[ns, UTC]"]).columns
+    if len(date_cols):
+        # Only copy when there is something to rewrite; _json_records never mutates
+        df = df.assign(**{col: df[col].astype(str) for col in date_cols})
+    return _json_records(df)
+
+
+def _upsert_batch(client, table_name: str, batch: list[dict], on_conflict: str | None = None):
+    # Nothing reads the written rows back, so don't have PostgREST echo them.
+    returning = ReturnMethod.minimal
+    try:
+        if on_conflict:
+            client.table(table_name).upsert(batch, on_conflict=on_conflict, returning=returning).execute()
+        else:
+            client.table(table_name).upsert(batch, returning=returning).execute()
+    except Exception as e:
+        # Fallback for environments where unique constraints were not migrated yet.
+        msg = str(e).lower()
+        if "no unique" in msg or "there is no unique or exclusion constraint" in msg:
+            print(
+                f"[_batch_upsert] ⚠️ Upsert not available for {table_name} without unique constraint. "
+                "Falling back to insert."
+            )
+            client.table(table_name).insert(batch, returning=returning).execute()
+        else:
+            raise
 
 
 def _batch_upsert(client, table_name: str, records: list[dict], on_conflict: str | None = None):
     total = len(records)
-    for i in range(0, total, BATCH_SIZE):
-        batch = records[i : i + BATCH_SIZE]
+    starts = range(0, total, BATCH_SIZE)
+
+    def upsert(start):
+        _upsert_batch(client, table_name, records[start : start + BATCH_SIZE], on_conflict)
+
+    with ThreadPoolExecutor(max_workers=MAX_INFLIGHT_BATCHES) as pool:
         try:
-            if on_conflict:
-                client.table(table_name).upsert(batch, on_conflict=on_conflict).execute()
-            else:
-                client.table(table_name).upsert(batch).execute()
-        except Exception as e:
-            # Fallback for environments where unique constraints were not migrated yet.
-            msg = str(e).lower()
-            if "no unique" in msg or "there is no unique or exclusion constraint" in msg:
-                print(
-                    f"[_batch_upsert] ⚠️ Upsert not available for {table_name} without unique constraint. "
-                    "Falling back to insert."
-                )
-                client.table(table_name).insert(batch).execute()
-            else:
-                raise
-        end = min(i + BATCH_SIZE, total)
-        print(f"Upserted rows {i + 1}-{end} of {total} into {table_name}")
+            for start, _ in zip(starts, pool.map(upsert, starts)):
+                end = min(start + BATCH_SIZE, total)
+                print(f"Upserted rows {start + 1}-{end} of {total} into {table_name}")
+        except Exception:
+            # Don't send batches that haven't started once one has failed.
+            pool.shutdown(cancel_futures=True)
+            raise
+
+
+def _iter_staged(staged_path: str, chunk_rows: int = STAGE_CHUNK_ROWS):
+    """
+    Yield a staged table as DataFrames of at most chunk_rows rows, from its
+    Parquet sidecar when that is at least as new as the CSV.
+    """
+    parquet_path = os.path.splitext(staged_path)[0] + ".parquet"
+    try:
+        use_parquet = pq is not None and (
+            os.path.getmtime(parquet_path) >= os.path.getmtime(staged_path)
+        )
+    except OSError:
+        use_parquet = False
+
+    if use_parquet:
+        for batch in pq.ParquetFile(parquet_path).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        # round_trip parses each float to exactly the value written to the CSV
+        yield from pd.read_csv(
+            staged_path,
+            dtype=STAGED_DTYPES,
+            float_precision="round_trip",
+            chunksize=chunk_rows,
+        )
+
+
+def _copy_csv(dsn: str, staged_path: str, table_name: str) -> int:
+    """Stream a staged CSV into table_name with a single server-side COPY."""
+    with open(staged_path, "r", encoding="utf-8", newline="") as f:
+        columns = next(csv.reader(f))
+        f.seek(0)
+        statement = sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv, HEADER true)").format(
+            sql.Identifier(table_name),
+            sql.SQL(", ").join([sql.Identifier(col) for col in columns]),
+        )
+        with psycopg.connect(dsn) as conn, conn.cursor() as cur:
+            with cur.copy(statement) as copy:
+                while chunk := f.read(COPY_CHUNK_BYTES):
+                    copy.write(chunk)
+            return cur.rowcount
 
 
 def load_to_supabase(staged_path: str, table_name: str):
@@ -90,12 +216,22 @@ def load_to_supabase(staged_path: str, table_name: str):
         raise FileNotFoundError(f"File not found: {staged_path}")
 
     print(f"Loading {staged_path} -> {table_name}")
-    df = pd.read_csv(staged_path)
-    records = _df_to_records(df)
+
+    # COPY against the Supabase Postgres when a direct connection is configured;
+    # otherwise go through the REST API in batches.
+    dsn = get_secret("DATABASE_URL")
+    if psycopg is not None and dsn:
+        rows = _copy_csv(dsn, staged_path, table_name)
+        print(f"Finished loading {rows} rows into '{table_name}' via COPY")
+        return
 
     client = get_supabase_client()
-    _batch_upsert(client, table_name, records)
-    print(f"Finished loading {len(records)} rows into '{table_name}'")
+    total = 0
+    for chunk in _iter_staged(staged_path):
+        records = _df_to_records(chunk)
+        _batch_upsert(client, table_name, records)
+        total += len(records)
+    print(f"Finished loading {total} rows into '{table_name}'")
 
 
 # ── New: user-scoped loader for uploaded data ─────────────────────────────────
@@ -291,9 +427,6 @@ def load_user_data(
         ).columns:
             d[col] = d[col].dt.strftime("%Y-%m-%d")
         
-        # Replace inf with nan first
-        d = d.replace([np.inf, -np.inf], np.nan)
-
         # De-duplicate by the same conflict key used in Supabase upsert.
         # Without this, PostgreSQL raises:
         # "ON CONFLICT DO UPDATE command cannot affect row a second time"
@@ -301,7 +434,7 @@ def load_user_data(
         conflict_cols = ["ticker", "date", "user_id"]
         if all(col in d.columns for col in conflict_cols):
             before_dedupe = len(d)
-            d = d.drop_duplicates(subset=conflict_cols, keep="last").copy()
+            d = d.drop_duplicates(subset=conflict_cols, keep="last")
             dropped = before_dedupe - len(d)
             if dropped > 0:
                 print(
@@ -309,17 +442,8 @@ def load_user_data(
                     f"on conflict key ({', '.join(conflict_cols)})."
                 )
         
-        # Convert all NaN/None to None (Python None, not numpy.nan)
-        d = d.where(pd.notnull(d), other=None)
-        
-        # Extra safety: explicitly handle any remaining NaN in dict conversion
-        records = d.to_dict(orient="records")
-        for record in records:
-            for key, val in record.items():
-                if pd.isna(val):
-                    record[key] = None
-        
-        return records
+        # NaN/NaT/±inf all become None (JSON null)
+        return _json_records(d)
 
     errors = []
 
@@ -435,8 +559,12 @@ if __name__ == "__main__":
 
     standard_path, category_path = transform_data()
 
-    print("\n--- Loading Standard Table (for ML/SVR) ---")
-    load_to_supabase(standard_path, "standard_table")
-
-    print("\n--- Loading Category Table (for LLM Recommendations) ---")
-    load_to_supabase(category_path, "category_table")
\ No newline at end of file
+    # The tables are independent, so their network waits can overlap.
+    print("\n--- Loading Standard Table (for ML/SVR) and Category Table (for LLM Recommendations) ---")
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        loads = [
+            pool.submit(load_to_supabase, standard_path, "standard_table"),
+            pool.submit(load_to_supabase, category_path, "category_table"),
+        ]
+        for future in loads:
+            future.result()
\ No newline at end of file
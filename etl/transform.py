@@ -1,10 +1,11 @@
 """ETL transform layer: clean, engineer features, and stage ML/LLM tables."""
 
-import json
 import os
 
 import numpy as np
+import orjson
 import pandas as pd
+from numba import njit
 
 REQUIRED_COLUMNS = [
     "date",
@@ -16,11 +17,26 @@ REQUIRED_COLUMNS = [
     "total_liabilities",
     "operating_cashflow",
 ]
+NUMERIC_COLUMNS = REQUIRED_COLUMNS[2:]
+
+# Column layouts of the staged/loaded tables (see create_tables.sql);
+# transform_dynamic appends user_id to both.
+STANDARD_COLUMNS = [
+    "date", "ticker", "revenue", "operating_income", "net_income",
+    "operating_cashflow", "total_assets", "total_liabilities",
+    "profit_margin", "operating_margin", "revenue_growth",
+    "net_income_growth", "asset_efficiency", "debt_to_asset",
+]
+CATEGORY_COLUMNS = [
+    "ticker", "date", "sector", "category", "risk_level",
+    "revenue", "operating_income", "net_income",
+]
 
 
 def _load_raw_df(raw_path: str) -> pd.DataFrame:
-    with open(raw_path, "r", encoding="utf-8") as f:
-        raw_data = json.load(f)
+    with open(raw_path, "rb") as f:
+        raw = f.read()
+    raw_data = orjson.loads(raw)
     df = pd.DataFrame(raw_data)
     df.columns = [c.lower().strip().replace(" ", "_") for c in df.columns]
     return df
@@ -34,11 +50,7 @@ def _clean_data(df: pd.DataFrame) -> pd.DataFrame:
     df = df.copy()
     df["date"] = pd.to_datetime(df["date"], errors="coerce")
 
-    numeric_cols = [
-        "revenue", "operating_income", "net_income",
-        "total_assets", "total_liabilities", "operating_cashflow",
-    ]
-    for col in numeric_cols:
+    for col in NUMERIC_COLUMNS:
         df[col] = pd.to_numeric(df[col], errors="coerce")
 
     before = len(df)
@@ -47,30 +59,60 @@ def _clean_data(df: pd.DataFrame) -> pd.DataFrame:
     if before != after:
         print(f"Dropped {before - after} incomplete rows")
 
+    # Few distinct tickers: store each once and group/map on integer codes
+    df["ticker"] = df["ticker"].astype("category")
+
     df = df.sort_values(["ticker", "date"]).reset_index(drop=True)
     return df
 
 
+FEATURE_COLUMNS = [
+    "profit_margin", "operating_margin", "revenue_growth",
+    "net_income_growth", "asset_efficiency", "debt_to_asset",
+]
+_FEATURE_INPUTS = [
+    "revenue", "operating_income", "net_income", "total_assets", "total_liabilities",
+]
+_EPS = 1e-9
+
+
+@njit(cache=True, error_model="numpy")
+def _ratio_features(revenue, operating_income, net_income, total_assets,
+                    total_liabilities, group_start):
+    """FEATURE_COLUMNS for every row in one sweep; growth restarts at each group_start."""
+    n = revenue.shape[0]
+    out = np.empty((n, 6))
+    for i in range(n):
+        out[i, 0] = (net_income[i] / (revenue[i] + _EPS)) * 100
+        out[i, 1] = (operating_income[i] / (revenue[i] + _EPS)) * 100
+        if group_start[i]:
+            out[i, 2] = np.nan
+            out[i, 3] = np.nan
+        else:
+            out[i, 2] = (revenue[i] / revenue[i - 1] - 1) * 100
+            out[i, 3] = (net_income[i] / net_income[i - 1] - 1) * 100
+        out[i, 4] = revenue[i] / (total_assets[i] + _EPS)
+        out[i, 5] = total_liabilities[i] / (total_assets[i] + _EPS)
+    return out
+
+
+# Pay the JIT compile cost at import rather than on the first transform
+_ratio_features(*([np.zeros(1)] * 5), np.ones(1, dtype=np.bool_))
+
+
 def _engineer_features(df: pd.DataFrame) -> pd.DataFrame:
-    eps = 1e-9
+    """Add FEATURE_COLUMNS; expects _clean_data's output (categorical ticker, (ticker, date) order)."""
     out = df.copy()
-    out["profit_margin"] = (out["net_income"] / (out["revenue"] + eps)) * 100
-    out["operating_margin"] = (out["operating_income"] / (out["revenue"] + eps)) * 100
-    out["revenue_growth"] = out.groupby("ticker")["revenue"].pct_change() * 100
-    out["net_income_growth"] = out.groupby("ticker")["net_income"].pct_change() * 100
-    out["asset_efficiency"] = out["revenue"] / (out["total_assets"] + eps)
-    out["debt_to_asset"] = out["total_liabilities"] / (out["total_assets"] + eps)
+    codes = out["ticker"].cat.codes.to_numpy()
+    group_start = np.ones(len(out), dtype=np.bool_)
+    group_start[1:] = codes[1:] != codes[:-1]
+    inputs = [out[col].to_numpy(dtype=np.float64) for col in _FEATURE_INPUTS]
+    out[FEATURE_COLUMNS] = _ratio_features(*inputs, group_start)
     return out
 
 
 def _build_standard_table(df: pd.DataFrame) -> pd.DataFrame:
-    cols = [
-        "date", "ticker", "revenue", "operating_income", "net_income",
-        "operating_cashflow", "total_assets", "total_liabilities",
-        "profit_margin", "operating_margin", "revenue_growth",
-        "net_income_growth", "asset_efficiency", "debt_to_asset",
-    ]
-    return df[[c for c in cols if c in df.columns]].copy()
+    return df[[c for c in STANDARD_COLUMNS if c in df.columns]].copy()
 
 
 def _build_category_table(df: pd.DataFrame) -> pd.DataFrame:
@@ -79,40 +121,36 @@ def _build_category_table(df: pd.DataFrame) -> pd.DataFrame:
         "GOOGL": "Technology", "AMZN": "Technology",
     }
 
-    cat = df[
-        ["ticker", "date", "revenue", "operating_income", "net_income",
-         "revenue_growth", "debt_to_asset"]
-    ].copy()
-    cat["sector"] = cat["ticker"].map(sector_map).fillna("Unknown")
-
-    cat["category"] = np.select(
-        [
-            cat["revenue_growth"] > 10,
-            (cat["revenue_growth"] > 0) & (cat["revenue_growth"] <= 10),
-            cat["revenue_growth"].notna(),
-        ],
-        ["High Growth", "Moderate Growth", "Stable"],
-        default="Unknown",
-    )
+    growth = df["revenue_growth"]
+    debt = df["debt_to_asset"]
+    # One assign + selection instead of copying a slice and mutating it
+    return df.assign(
+        # Maps each ticker category once rather than every row
+        sector=df["ticker"].map(sector_map).astype(object).fillna("Unknown"),
+        category=np.select(
+            [growth > 10, (growth > 0) & (growth <= 10), growth.notna()],
+            ["High Growth", "Moderate Growth", "Stable"],
+            default="Unknown",
+        ),
+        risk_level=np.select(
+            [debt > 0.7, (debt > 0.4) & (debt <= 0.7), debt.notna()],
+            ["High Risk", "Medium Risk", "Low Risk"],
+            default="Unknown",
+        ),
+    )[CATEGORY_COLUMNS]
 
-    cat["risk_level"] = np.select(
-        [
-            cat["debt_to_asset"] > 0.7,
-            (cat["debt_to_asset"] > 0.4) & (cat["debt_to_asset"] <= 0.7),
-            cat["debt_to_asset"].notna(),
-        ],
-        ["High Risk", "Medium Risk", "Low Risk"],
-        default="Unknown",
-    )
 
-    return cat[
-        ["ticker", "date", "sector", "category", "risk_level",
-         "revenue", "operating_income", "net_income"]
-    ]
+def _sanitize_for_csv(df: pd.DataFrame) -> pd.DataFrame:
+    """Turn ±inf into NaN, scanning only the numeric columns."""
+    num = df.select_dtypes(include="number")
+    infinite = np.isinf(num.to_numpy(dtype=float, na_value=np.nan))
+    if not infinite.any():
+        return df
+    return df.assign(**num.mask(infinite))
 
 
-def _sanitize_for_csv(df: pd.DataFrame) -> pd.DataFrame:
-    return df.replace([np.inf, -np.inf], np.nan)
+def _parquet_sidecar(csv_path: str) -> str:
+    return os.path.splitext(csv_path)[0] + ".parquet"
 
 
 def transform_data(raw_path=None):
@@ -147,6 +185,14 @@ def transform_data(raw_path=None):
     print(f"Standard table saved to {standard_path}")
     print(f"Category table saved to {category_path}")
 
+    # Typed Parquet copies let readers skip CSV parsing; the CSVs stay the
+    # canonical artifacts (COPY streams them as-is).
+    for table_df, csv_path in ((standard_df, standard_path), (category_df, category_path)):
+        try:
+            table_df.to_parquet(_parquet_sidecar(csv_path), index=False, compression="zstd")
+        except ImportError:
+            break
+
     return standard_path, category_path
 
 
@@ -178,11 +224,7 @@ def transform_dynamic(
 
     # Normalise types
     std_df["date"] = pd.to_datetime(std_df.get("date"), errors="coerce")
-    numeric_cols = [
-        "revenue", "operating_income", "net_income",
-        "operating_cashflow", "total_assets", "total_liabilities",
-    ]
-    for col in numeric_cols:
+    for col in NUMERIC_COLUMNS:
         if col in std_df.columns:
             std_df[col] = pd.to_numeric(std_df[col], errors="coerce")
         else:
@@ -225,16 +267,10 @@ def transform_dynamic(
     )
 
     std_df["user_id"] = user_id
-    std_df = std_df.replace([np.inf, -np.inf], np.nan)
+    std_df = _sanitize_for_csv(std_df)
 
     # Select and order columns to match standard_table schema
-    std_cols = [
-        "date", "ticker", "revenue", "operating_income", "net_income",
-        "operating_cashflow", "total_assets", "total_liabilities",
-        "profit_margin", "operating_margin", "revenue_growth",
-        "net_income_growth", "asset_efficiency", "debt_to_asset",
-        "user_id",
-    ]
+    std_cols = STANDARD_COLUMNS + ["user_id"]
     std_df = std_df[[c for c in std_cols if c in std_df.columns]]
 
     # ── Category table ────────────────────────────────────────────────────────
@@ -253,10 +289,7 @@ def transform_dynamic(
     cat_df["date"] = pd.to_datetime(cat_df.get("date"), errors="coerce")
     cat_df["user_id"] = user_id
 
-    cat_cols = [
-        "ticker", "date", "sector", "category", "risk_level",
-        "revenue", "operating_income", "net_income", "user_id",
-    ]
+    cat_cols = CATEGORY_COLUMNS + ["user_id"]
     cat_df = cat_df[[c for c in cat_cols if c in cat_df.columns]]
 
     return {"standard_table": std_df, "category_table": cat_df}
@@ -55,7 +55,7 @@ def build_supervised_dataset(df, target_col="net_income", horizon=1):
     work_df = df.copy().sort_values(["ticker", "date"]).reset_index(drop=True)
     
     # Growth-rate target: % YoY change
-    work_df[f"{target_col}_next"] = work_df.groupby("ticker")[target_col].shift(-horizon)
+    work_df[f"{target_col}_next"] = work_df.groupby("ticker", observed=True)[target_col].shift(-horizon)
     work_df["target"] = ((work_df[f"{target_col}_next"] - work_df[target_col]) / work_df[target_col]) * 100
     
     target_name = "target"
@@ -92,7 +92,7 @@ def build_supervised_dataset(df, target_col="net_income", horizon=1):
             "Check for zero-denominator growth values or non-numeric financial fields."
         )
 
-    last_rows = work_df.groupby("ticker", as_index=False).tail(1).copy()
+    last_rows = work_df.groupby("ticker", as_index=False, observed=True).tail(1).copy()
     future_df = pd.get_dummies(last_rows, columns=["ticker"], drop_first=True)
     for col in ticker_dummy_cols:
         if col not in future_df.columns:
@@ -43,10 +43,10 @@ def run_phase3_1():
     print("=" * 70)
 
 
-def run_phase3_2():
+def run_phase3_2(compress_reports=False):
     """Execute Phase 3.2: Feature Analysis"""
     from scripts.run_feature_analysis import run_full_feature_analysis
-    run_full_feature_analysis()
+    run_full_feature_analysis(compress_reports=compress_reports)
 
 
 def run_phase4(target_growth_rate=10.0):
@@ -107,14 +107,14 @@ def run_phase6():
     print("=" * 70)
 
 
-def run_all_phases(target_growth_rate=10.0, shap_nsamples=200):
+def run_all_phases(target_growth_rate=10.0, shap_nsamples=200, compress_reports=False):
     """Execute complete pipeline: Phases 3.1, 3.2, 4, 5, 6"""
     print("\n" + "=" * 70)
     print("FINCAST - COMPLETE PIPELINE EXECUTION")
     print("=" * 70)
 
     run_phase3_1()
-    run_phase3_2()
+    run_phase3_2(compress_reports)
     run_phase4(target_growth_rate)
     run_phase5(shap_nsamples)
     run_phase6()
@@ -149,6 +149,11 @@ def main():
         default=200,
         help="Number of SHAP sampling evaluations for Phase 5 (default: 200)",
     )
+    parser.add_argument(
+        "--compress-reports",
+        action="store_true",
+        help="Write Phase 3.2's wide reports (ml_ready_data, correlation_matrix) as .csv.gz",
+    )
 
     args = parser.parse_args()
 
@@ -156,7 +161,7 @@ def main():
         if args.phase == "3.1":
             run_phase3_1()
         elif args.phase == "3.2":
-            run_phase3_2()
+            run_phase3_2(args.compress_reports)
         elif args.phase == "4":
             run_phase4(args.target_growth)
         elif args.phase == "5":
@@ -164,7 +169,7 @@ def main():
         elif args.phase == "6":
             run_phase6()
         else:
-            run_all_phases(args.target_growth, args.shap_nsamples)
+            run_all_phases(args.target_growth, args.shap_nsamples, args.compress_reports)
     except Exception as e:
         print(f"\n✗ Error: {e}")
         import traceback
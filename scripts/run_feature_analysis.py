@@ -1,79 +1,305 @@
 """Phase 3.2: Feature Analysis Orchestrator"""
 
+import argparse
+import contextlib
+import csv
+import gzip
+import hashlib
+import io
 import os
+import pickle
 import sys
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:  # pyarrow is optional; reports fall back to DataFrame.to_csv
+    pa = pacsv = None
+
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analysis.data_connection import get_analysis_data
 from analysis.feature_analysis import run_feature_analysis
 from analysis.timeseries_analysis import run_timeseries_analysis
-from analysis.outlier_treatment import run_outlier_treatment
+from analysis.outlier_treatment import TreatmentRecommendation, run_outlier_treatment
 from analysis.feature_preprocessing import run_feature_preprocessing
 
+CORRELATION_DECIMALS = 4
+# Last successful result of each stage, reused by reruns that skip it (see --stages)
+STAGE_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "cache", "phase_3_2"
+)
+# CLI stage name -> results key; "summary" is the report writing step
+STAGES = {
+    "feature": "feature_analysis",
+    "timeseries": "timeseries_analysis",
+    "outlier": "outlier_treatment",
+    "preprocessing": "preprocessing",
+}
+
+
+@contextlib.contextmanager
+def _published(path):
+    """
+    Yield a temporary path that atomically replaces path once the body
+    succeeds, so concurrent readers never see a half-written report.
+    """
+    tmp_path = f"{path}.tmp"
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+
+def _to_csv(frame, path, index=False):
+    with _published(path) as tmp_path:
+        frame.to_csv(tmp_path, index=index)
+
+
+def _arrow_column(col):
+    """Arrow array for one column; midnight-only timestamps are written as plain dates."""
+    if pd.api.types.is_datetime64_any_dtype(col) and col.dt.tz is None:
+        present = col.dropna()
+        if (present == present.dt.normalize()).all():
+            return pa.array(col.to_numpy().astype("datetime64[D]"), type=pa.date32(), from_pandas=True)
+    return pa.array(col, from_pandas=True)
+
+
+def _frame_digest(frame, index):
+    """Content hash of frame plus everything else that shapes its CSV text."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{pacsv is not None}|{index}|{frame.index.name}|{list(frame.columns)}|"
+                  f"{list(frame.dtypes.astype(str))}".encode())
+    digest.update(pd.util.hash_pandas_object(frame, index=index).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _write_csv(frame, path, index=False):
+    """
+    Write a wide report CSV with PyArrow's multi-threaded writer when available.
+    Arrow spells values its own way (1 instead of 1.0, true/false, quoted text)
+    but they parse back to the same data; without pyarrow this is to_csv.
+    Paths ending in .gz are gzip-compressed (level 1, so CPU stays cheap).
+    A <path>.hash sidecar lets reruns with identical data skip the write.
+    """
+    hash_path = f"{path}.hash"
+    digest = _frame_digest(frame, index)
+    try:
+        # The file's size/mtime are recorded too, so edits or checkouts of it invalidate the hash
+        stat = os.stat(path)
+        with open(hash_path, encoding="utf-8") as f:
+            unchanged = f.read() == f"{digest} {stat.st_size} {stat.st_mtime_ns}"
+    except OSError:
+        unchanged = False
+    if unchanged:
+        print(f"✓ {os.path.basename(path)} unchanged, skipped write")
+        return
+
+    table = None
+    if pacsv is not None:
+        header = ([frame.index.name or ""] if index else []) + [str(c) for c in frame.columns]
+        body = frame.reset_index() if index else frame
+        try:
+            table = pa.Table.from_arrays(
+                [_arrow_column(col) for _, col in body.items()],
+                names=[str(i) for i in range(body.shape[1])],
+            )
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            table = None  # Mixed-type object columns; let pandas format them
+
+    if table is None:
+        compression = {"method": "gzip", "compresslevel": 1} if path.endswith(".gz") else None
+        with _published(path) as tmp_path:
+            frame.to_csv(tmp_path, index=index, compression=compression)
+    else:
+        header_line = io.StringIO()
+        csv.writer(header_line, lineterminator="\n").writerow(header)
+        # One large buffer in front of the file, so the writer/compressor issue few syscalls
+        with _published(path) as tmp_path, open(tmp_path, "wb", buffering=1 << 20) as raw:
+            sink = (gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=1)
+                    if path.endswith(".gz") else contextlib.nullcontext(raw))
+            with sink as out:
+                out.write(header_line.getvalue().encode("utf-8"))
+                pacsv.write_csv(table, out, write_options=pacsv.WriteOptions(include_header=False))
+
+    # Written last, so an interrupted CSV write is never mistaken for current
+    stat = os.stat(path)
+    with _published(hash_path) as tmp_path, open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(f"{digest} {stat.st_size} {stat.st_mtime_ns}")
+
+
+def _write_report(frame, path, index=False, compress=False):
+    """
+    _write_csv the report as path or path.gz, then drop the other variant and
+    its .hash sidecar so toggling --compress-reports leaves no stale copy.
+    """
+    target, stale = (f"{path}.gz", path) if compress else (path, f"{path}.gz")
+    _write_csv(frame, target, index=index)
+    for leftover in (stale, f"{stale}.hash"):
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(leftover)
+
+
+def _write_rows_csv(path, header, rows):
+    """Stream plain rows to a CSV with csv.writer, skipping the DataFrame round trip."""
+    with _published(path) as tmp_path, open(tmp_path, 'w', newline='', encoding='utf-8', buffering=1 << 20) as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def _write_trends_csv(trend_slopes, path):
+    """Write {company: {metric: trend}} as one CSV row per (company, metric)."""
+    trend_columns = ['slope', 'intercept', 'slope_interpretation', 'r_squared']
+    _write_rows_csv(path, ['company', 'metric'] + trend_columns, (
+        # NaN is written blank, as to_csv would
+        [company, metric] + ["" if pd.isna(trend[col]) else trend[col] for col in trend_columns]
+        for company, trends in trend_slopes.items()
+        for metric, trend in trends.items()
+    ))
 
-def save_results(results, report_dir="analysis/reports"):
-    """Save all feature analysis results to CSV files."""
+
+def save_results(results, report_dir="analysis/reports", compress=False):
+    """
+    Save all feature analysis results to CSV files.
+    With compress=True the wide reports are written as .csv.gz instead.
+    """
     os.makedirs(report_dir, exist_ok=True)
+    # (frame, filename, write index?) for every CSV report; written concurrently below.
+    # The wide, all-numeric ones go through _write_csv (PyArrow, skipped if unchanged).
+    arrow_reports = {"correlation_matrix.csv", "ml_ready_data.csv"}
+    csv_reports = []
+    # Each stage's result (None if it failed), looked up once for both the CSVs and the summary
+    feature_results = results['feature_analysis']
+    timeseries_results = results['timeseries_analysis']
+    outlier_results = results['outlier_treatment']
+    preprocessing_results = results['preprocessing']
     
     # Feature importance & correlation
-    if results['feature_analysis']:
-        if 'importance_results' in results['feature_analysis']:
-            results['feature_analysis']['importance_results']['feature_importance'].to_csv(
-                f"{report_dir}/feature_importance.csv", index=False
-            )
-        if 'correlation_results' in results['feature_analysis']:
-            results['feature_analysis']['correlation_results']['correlation_matrix'].to_csv(
-                f"{report_dir}/correlation_matrix.csv"
-            )
+    if feature_results:
+        if 'importance_results' in feature_results:
+            csv_reports.append((
+                feature_results['importance_results']['feature_importance'],
+                "feature_importance.csv", False,
+            ))
+        if 'correlation_results' in feature_results:
+            # Correlations live in [-1, 1]; 4 decimals is plenty and keeps cells ~4x shorter
+            csv_reports.append((
+                feature_results['correlation_results']['correlation_matrix']
+                .round(CORRELATION_DECIMALS),
+                "correlation_matrix.csv", True,
+            ))
     
-    # Time-series trends
-    if results['timeseries_analysis'] and 'trend_slopes' in results['timeseries_analysis']:
-        trends_data = []
-        for company, trends in results['timeseries_analysis']['trend_slopes'].items():
-            for metric, info in trends.items():
-                trends_data.append({'company': company, 'metric': metric, **info})
-        if trends_data:
-            pd.DataFrame(trends_data).to_csv(f"{report_dir}/timeseries_trends.csv", index=False)
+    # Time-series trends: small and already row-shaped, so streamed straight to CSV
+    trend_slopes = timeseries_results.get('trend_slopes') if timeseries_results else None
+    if trend_slopes and not any(trend_slopes.values()):
+        trend_slopes = None
     
-    # Outlier recommendations
-    if results['outlier_treatment'] and 'recommendations' in results['outlier_treatment']:
-        if results['outlier_treatment']['recommendations']:
-            pd.DataFrame(results['outlier_treatment']['recommendations']).to_csv(
-                f"{report_dir}/outlier_recommendations.csv", index=False
-            )
+    # Outlier recommendations: already uniform TreatmentRecommendation rows, so
+    # streamed like the trends without building (and type-inferring) a frame
+    recommendations = outlier_results.get('recommendations') if outlier_results else None
     
     # Preprocessing steps & ML-ready data
-    if results['preprocessing'] and 'processed_data' in results['preprocessing']:
-        pd.DataFrame(results['preprocessing']['preprocessing_steps']).to_csv(
-            f"{report_dir}/preprocessing_steps.csv", index=False
-        )
-        results['preprocessing']['processed_data'].to_csv(
-            f"{report_dir}/ml_ready_data.csv", index=False
-        )
+    if preprocessing_results and 'processed_data' in preprocessing_results:
+        csv_reports.append((
+            pd.DataFrame(preprocessing_results['preprocessing_steps']),
+            "preprocessing_steps.csv", False,
+        ))
+        csv_reports.append((
+            preprocessing_results['processed_data'], "ml_ready_data.csv", False,
+        ))
+    
+    # The files are independent, so the slowest write (ml_ready_data) bounds the total
+    if csv_reports or trend_slopes or recommendations:
+        with ThreadPoolExecutor(max_workers=len(csv_reports) + 2) as pool:
+            futures = []
+            if trend_slopes:
+                futures.append(pool.submit(_write_trends_csv, trend_slopes, f"{report_dir}/timeseries_trends.csv"))
+            if recommendations:
+                futures.append(pool.submit(
+                    _write_rows_csv, f"{report_dir}/outlier_recommendations.csv",
+                    list(TreatmentRecommendation._fields), recommendations,
+                ))
+            for frame, filename, index in csv_reports:
+                path = f"{report_dir}/{filename}"
+                if filename in arrow_reports:
+                    futures.append(pool.submit(_write_report, frame, path, index=index, compress=compress))
+                else:
+                    futures.append(pool.submit(_to_csv, frame, path, index=index))
+            for future in futures:
+                future.result()
+    
+    # Summary report, assembled first and written in one call
+    parts = [
+        f"{'='*70}\nPHASE 3.2: FEATURE ANALYSIS SUMMARY\n{'='*70}\n",
+        f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n",
+    ]
+    if feature_results:
+        parts.append("✓ Feature importance rankings saved\n")
+        parts.append("✓ Correlation matrix saved\n")
+    if timeseries_results:
+        parts.append("✓ Time-series trend analysis saved\n")
+    if outlier_results:
+        parts.append("✓ Outlier recommendations saved\n")
+    if preprocessing_results:
+        parts.append("✓ ML-ready dataset saved\n")
+    parts.append(f"\n{'='*70}\nPhase 3.2 Complete! Ready for Phase 4\n{'='*70}\n")
+    
+    summary_path = f"{report_dir}/phase_3_2_summary.txt"
+    with _published(summary_path) as tmp_path, open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write("".join(parts))
+
+
+def _stage_cache_path(key):
+    return os.path.join(STAGE_CACHE_DIR, f"{key}.pkl")
+
+
+def _load_stage_result(key):
+    try:
+        with open(_stage_cache_path(key), "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+
+
+def _save_stage_result(key, result):
+    try:
+        os.makedirs(STAGE_CACHE_DIR, exist_ok=True)
+        with _published(_stage_cache_path(key)) as tmp_path, open(tmp_path, "wb") as f:
+            # Protocol 5 keeps numpy/pandas buffers out of band for cheaper loads
+            pickle.dump(result, f, protocol=5)
+    except (OSError, pickle.PicklingError) as e:
+        print(f"⚠ Could not cache {key} results: {e}")
+
+
+def _run_stage(func, data):
+    """Run one stage in a worker, returning (result, error, captured stdout)."""
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        try:
+            return func(data=data), None, buf.getvalue()
+        except Exception as e:
+            return None, str(e), buf.getvalue()
+
+
+def run_full_feature_analysis(compress_reports=False, stages=None):
+    """
+    Execute all Phase 3.2 components.
     
-    # Summary report
-    with open(f"{report_dir}/phase_3_2_summary.txt", 'w', encoding='utf-8') as f:
-        f.write(f"{'='*70}\nPHASE 3.2: FEATURE ANALYSIS SUMMARY\n{'='*70}\n")
-        f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-        
-        if results['feature_analysis']:
-            f.write("✓ Feature importance rankings saved\n")
-            f.write("✓ Correlation matrix saved\n")
-        if results['timeseries_analysis']:
-            f.write("✓ Time-series trend analysis saved\n")
-        if results['outlier_treatment']:
-            f.write("✓ Outlier recommendations saved\n")
-        if results['preprocessing']:
-            f.write("✓ ML-ready dataset saved\n")
-        
-        f.write(f"\n{'='*70}\nPhase 3.2 Complete! Ready for Phase 4\n{'='*70}\n")
-
-
-def run_full_feature_analysis():
-    """Execute all Phase 3.2 components."""
+    Args:
+        compress_reports: Write the wide reports as .csv.gz
+        stages: Names from STAGES (plus "summary" for the reports) to run;
+            the other stages reuse their last cached result. None runs everything.
+    """
     print(f"\n{'='*70}\nPHASE 3.2: FEATURE ANALYSIS\n{'='*70}\n")
     
+    stages = set(STAGES) | {"summary"} if stages is None else set(stages)
+    fresh = {STAGES[name] for name in stages if name in STAGES}
     results = {}
     
     steps = [
@@ -83,21 +309,65 @@ def run_full_feature_analysis():
         ("preprocessing", "Feature Preprocessing", run_feature_preprocessing),
     ]
     
-    for i, (key, name, func) in enumerate(steps, 1):
-        print(f"\n[{i}/4] {name}...")
+    # Load the tables once and hand the same frames to every stage. On failure
+    # each stage retries the load itself and reports its own error as before.
+    data = None
+    if fresh:
         try:
-            results[key] = func()
-            print(f"✓ {name} complete")
+            data = get_analysis_data()
         except Exception as e:
-            print(f"✗ {name} failed: {e}")
-            results[key] = None
+            print(f"✗ Shared data load failed: {e}")
     
-    print(f"\n{'='*70}\nSaving reports...\n{'='*70}\n")
-    save_results(results)
-    print(f"✓ All reports saved to: analysis/reports/\n")
+    # The stages are CPU-bound and independent, so run them all in separate
+    # processes; output is replayed in order once each one finishes.
+    with ProcessPoolExecutor(max_workers=max(1, min(len(fresh), os.cpu_count() or 1))) as pool:
+        futures = {key: pool.submit(_run_stage, func, data) for key, _, func in steps if key in fresh}
+        for i, (key, name, _) in enumerate(steps, 1):
+            print(f"\n[{i}/4] {name}...")
+            if key not in futures:
+                results[key] = _load_stage_result(key)
+                if results[key] is None:
+                    print(f"✗ {name} skipped and no cached result found")
+                else:
+                    print(f"✓ {name} skipped; reusing cached result from {_stage_cache_path(key)}")
+                continue
+            try:
+                results[key], error, output = futures[key].result()
+            except Exception as e:
+                results[key], error, output = None, str(e), ""
+            print(output, end="")
+            if error is None:
+                print(f"✓ {name} complete")
+                if results[key] is not None:
+                    _save_stage_result(key, results[key])
+            else:
+                print(f"✗ {name} failed: {error}")
+    
+    if "summary" in stages:
+        print(f"\n{'='*70}\nSaving reports...\n{'='*70}\n")
+        save_results(results, compress=compress_reports)
+        print(f"✓ All reports saved to: analysis/reports/\n")
     
     return results
 
 
 if __name__ == "__main__":
-    run_full_feature_analysis()
+    parser = argparse.ArgumentParser(description="Phase 3.2: Feature Analysis")
+    parser.add_argument(
+        "--stages",
+        default=",".join([*STAGES, "summary"]),
+        help="Comma-separated stages to run: feature, timeseries, outlier, preprocessing, summary "
+             "(default: all). Skipped stages reuse their last cached result.",
+    )
+    parser.add_argument(
+        "--compress-reports",
+        action="store_true",
+        help="Write the wide reports (ml_ready_data, correlation_matrix) as .csv.gz",
+    )
+    args = parser.parse_args()
+    
+    selected = [name.strip() for name in args.stages.split(",") if name.strip()]
+    unknown = sorted(set(selected) - set(STAGES) - {"summary"})
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)}")
+    run_full_feature_analysis(compress_reports=args.compress_reports, stages=selected)
@@ -22,6 +22,19 @@ sql_file = project_root / "etl" / "create_tables.sql"
 with open(sql_file) as f:
     sql_script = f.read()
 
+# With a direct Postgres connection, apply the whole schema in one transaction
+try:
+    import psycopg
+except ImportError:  # psycopg is optional; fall back to the exec_sql RPC
+    psycopg = None
+
+database_url = get_secret("DATABASE_URL")
+if psycopg is not None and database_url:
+    with psycopg.connect(database_url) as conn:
+        conn.execute(sql_script)
+    print("✓ Tables created successfully!")
+    exit(0)
+
 # Create client with service role key
 client = create_client(url, service_key)
 
@@ -0,0 +1,524 @@
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+from analysis import data_connection  # noqa: E402
+from analysis.feature_analysis import (  # noqa: E402
+    _correlation_matrix,
+    calculate_feature_importance,
+    identify_redundant_features,
+)
+from analysis.feature_preprocessing import prepare_ml_dataset  # noqa: E402
+from analysis.historical_performance import calculate_performance_table  # noqa: E402
+from analysis.insights import detect_anomalies  # noqa: E402
+from analysis import timeseries_analysis  # noqa: E402
+from analysis.timeseries_analysis import calculate_trend_slope  # noqa: E402
+from analysis.outlier_treatment import (  # noqa: E402
+    analyze_columns,
+    detect_extreme_values,
+    detect_statistical_outliers,
+    flag_anomalies,
+)
+from etl import load  # noqa: E402
+
+
+def _offline_client():
+    raise ValueError("offline")
+
+
+class DataConnectionCacheTests(unittest.TestCase):
+    def setUp(self):
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        patcher = mock.patch.object(data_connection, "TABLE_CACHE_DIR", cache_dir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        data_connection.invalidate_cache()
+        self.addCleanup(data_connection.invalidate_cache)
+
+    def test_analysis_data_is_loaded_once_per_process(self):
+        with mock.patch.object(
+            data_connection, "get_supabase_client", side_effect=_offline_client
+        ) as client:
+            first = data_connection.get_analysis_data()
+            second = data_connection.get_analysis_data()
+            data_connection.get_company_data("AAPL")
+            data_connection.get_companies_list()
+
+        self.assertIs(first, second)
+        # One attempt per table; the staged CSV fallback is then reused.
+        self.assertEqual(client.call_count, 2)
+
+    def test_invalidate_cache_forces_reload(self):
+        with mock.patch.object(
+            data_connection, "get_supabase_client", side_effect=_offline_client
+        ) as client:
+            data_connection.get_standard_table_data()
+            data_connection.invalidate_cache()
+            data_connection.get_standard_table_data()
+
+        self.assertEqual(client.call_count, 2)
+
+    def test_company_data_filters_server_side_when_table_not_cached(self):
+        supabase = mock.MagicMock()
+        query = supabase.table.return_value.select.return_value
+        query.eq.return_value.execute.return_value.data = [
+            {"ticker": "AAPL", "date": "2021-12-31", "revenue": 2.0},
+            {"ticker": "AAPL", "date": "2020-12-31", "revenue": 1.0},
+        ]
+
+        with mock.patch.object(data_connection, "get_supabase_client", return_value=supabase):
+            company = data_connection.get_company_data("AAPL")
+
+        supabase.table.return_value.select.assert_called_once_with("*")
+        query.eq.assert_called_once_with("ticker", "AAPL")
+        self.assertEqual(company["revenue"].tolist(), [1.0, 2.0])
+
+    def test_whole_table_reads_are_reused_from_disk_across_processes(self):
+        supabase = mock.MagicMock()
+        supabase.table.return_value.select.return_value.execute.return_value.data = [
+            {"ticker": "AAPL", "date": "2021-12-31", "revenue": 2.0},
+            {"ticker": "AAPL", "date": "2020-12-31", "revenue": 1.0},
+        ]
+
+        with mock.patch.object(data_connection, "get_supabase_client", return_value=supabase) as client:
+            fetched = data_connection.get_table_data("standard_table")
+            # A fresh process only has the disk copy
+            data_connection.get_standard_table_data.cache_clear()
+            reused = data_connection.get_table_data("standard_table")
+
+        self.assertEqual(client.call_count, 1)
+        pd.testing.assert_frame_equal(reused, fetched)
+
+    def test_logged_in_sessions_never_share_cached_frames(self):
+        frames = {
+            "alice": pd.DataFrame({"ticker": ["AAA"], "date": ["2021-12-31"], "revenue": [1.0]}),
+            "bob": pd.DataFrame({"ticker": ["BBB"], "date": ["2021-12-31"], "revenue": [2.0]}),
+        }
+        current = {}
+
+        def fetch(table_name, columns=None, ticker=None):
+            frame = frames[current["user"]]
+            return frame[frame["ticker"] == ticker].copy() if ticker else frame.copy()
+
+        with mock.patch.object(
+            data_connection, "_get_streamlit_session", side_effect=lambda: (None, current["user"])
+        ), mock.patch.object(data_connection, "get_table_data", side_effect=fetch):
+            current["user"] = "alice"
+            alice = data_connection.get_standard_table_data()
+            current["user"] = "bob"
+            bob = data_connection.get_standard_table_data()
+            # Alice's table must not be sliced to answer Bob's company lookup
+            with mock.patch("builtins.print"), self.assertRaises(ValueError):
+                data_connection.get_company_data("AAA")
+
+        self.assertEqual(alice["ticker"].tolist(), ["AAA"])
+        self.assertEqual(bob["ticker"].tolist(), ["BBB"])
+        self.assertEqual(data_connection.get_standard_table_data.cache_info().currsize, 0)
+
+    def test_sorted_by_ticker_date_skips_already_ordered_frames(self):
+        with mock.patch.object(
+            data_connection, "get_supabase_client", side_effect=_offline_client
+        ):
+            standard_df = data_connection.get_standard_table_data()
+
+        self.assertIs(data_connection.sorted_by_ticker_date(standard_df), standard_df)
+        shuffled = standard_df.sample(frac=1, random_state=0)
+        pd.testing.assert_frame_equal(
+            data_connection.sorted_by_ticker_date(shuffled), standard_df
+        )
+
+    def test_staged_reads_prefer_a_fresh_parquet_sidecar(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = Path(tmp) / "standard_table.csv"
+            parquet_path = csv_path.with_suffix(".parquet")
+            pd.DataFrame({"ticker": ["CSV"], "revenue": [1.0]}).to_csv(csv_path, index=False)
+            pd.DataFrame({"ticker": ["PQ"], "revenue": [1.0]}).to_parquet(parquet_path, index=False)
+
+            os.utime(parquet_path, (2_000_000_000, 2_000_000_000))
+            self.assertEqual(data_connection._read_staged_csv(str(csv_path))["ticker"].tolist(), ["PQ"])
+            self.assertEqual(pd.concat(load._iter_staged(str(csv_path)))["ticker"].tolist(), ["PQ"])
+
+            # A CSV rewritten after the sidecar wins over the stale Parquet.
+            os.utime(parquet_path, (1_000_000_000, 1_000_000_000))
+            self.assertEqual(data_connection._read_staged_csv(str(csv_path))["ticker"].tolist(), ["CSV"])
+            self.assertEqual(pd.concat(load._iter_staged(str(csv_path)))["ticker"].tolist(), ["CSV"])
+            # ...and that read refreshed the sidecar, so the next one skips the CSV parse.
+            self.assertEqual(pd.read_parquet(parquet_path)["ticker"].tolist(), ["CSV"])
+            self.assertGreaterEqual(os.path.getmtime(parquet_path), os.path.getmtime(csv_path))
+
+    def test_analysis_data_selects_only_context_columns(self):
+        with mock.patch.object(
+            data_connection, "get_supabase_client", side_effect=_offline_client
+        ):
+            _, category_df, merged_df = data_connection.get_analysis_data()
+
+        self.assertEqual(
+            tuple(category_df.columns), data_connection.CATEGORY_CONTEXT_COLUMNS
+        )
+        self.assertTrue({"sector", "category", "risk_level"} <= set(merged_df.columns))
+
+
+class FeatureAnalysisTests(unittest.TestCase):
+    def test_redundant_features_scan_upper_triangle_only(self):
+        corr = pd.DataFrame(
+            [[1.0, 0.9, -0.85], [0.9, 1.0, 0.1], [-0.85, 0.1, 1.0]],
+            index=["a", "b", "c"],
+            columns=["a", "b", "c"],
+        )
+
+        pairs = identify_redundant_features(corr, threshold=0.8)
+
+        self.assertEqual(
+            [(p["feature_1"], p["feature_2"]) for p in pairs],
+            [("a", "b"), ("a", "c")],
+        )
+        self.assertTrue(np.isclose(pairs[1]["correlation"], -0.85))
+        self.assertIn("Consider removing c", pairs[1]["recommendation"])
+
+    def test_correlation_matrix_matches_pandas_pairwise_corr(self):
+        rng = np.random.default_rng(0)
+        values = rng.normal(size=(50, 4)) * [1.0, 1e9, 1e-6, 3.0] + [0.0, 1e12, 0.0, 5.0]
+        values[rng.random(values.shape) < 0.2] = np.nan
+        df = pd.DataFrame(values, columns=["a", "b", "c", "d"])
+        df["constant"] = 2.0
+
+        pd.testing.assert_frame_equal(_correlation_matrix(df), df.corr(), atol=1e-12)
+
+    def test_feature_importance_ranks_small_frames(self):
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame(rng.normal(size=(19, 4)), columns=["driver", "noise_a", "noise_b", "noise_c"])
+        df["net_profit"] = 3 * df["driver"] + rng.normal(scale=0.1, size=19)
+
+        scores = calculate_feature_importance(df)["feature_importance"]
+
+        self.assertEqual(scores.iloc[0]["feature"], "driver")
+        self.assertFalse(scores["cumulative_importance_pct"].isna().any())
+        self.assertAlmostEqual(scores["cumulative_importance_pct"].iloc[-1], 100.0)
+
+    def test_feature_importance_without_signal_reports_zero_shares(self):
+        df = pd.DataFrame({"a": np.arange(10.0), "b": np.arange(10.0) % 3, "net_profit": 1.0})
+
+        scores = calculate_feature_importance(df)["feature_importance"]
+
+        self.assertTrue((scores["importance"] == 0).all())
+        self.assertTrue((scores["cumulative_importance_pct"] == 0).all())
+
+
+def _company_frame():
+    return pd.DataFrame({
+        "date": pd.to_datetime(
+            ["2021-12-31", "2020-12-31", "2022-12-31", "2020-12-31", "2021-12-31"]
+        ),
+        "ticker": pd.Categorical(["AAA", "AAA", "AAA", "BBB", "BBB"]),
+        "revenue": [150.0, 100.0, 200.0, 80.0, 60.0],
+        "net_income": [15.0, 10.0, 30.0, -5.0, 4.0],
+        "profit_margin": [10.0, 10.0, 15.0, -6.25, 6.67],
+        "operating_margin": [12.0, np.nan, 18.0, 1.0, 2.0],
+        "operating_cashflow": [20.0, 10.0, 30.0, 5.0, 6.0],
+        "debt_to_asset": [0.5, 0.6, 0.4, 0.3, 0.35],
+        "asset_efficiency": [0.8, 0.7, 0.9, 1.1, 1.0],
+    })
+
+
+class HistoricalPerformanceTests(unittest.TestCase):
+    def test_metrics_use_chronological_endpoints_per_ticker(self):
+        table = calculate_performance_table(_company_frame())
+
+        aaa = table["AAA"]
+        self.assertEqual(aaa["num_years"], 3)
+        self.assertEqual(aaa["revenue_start"], 100.0)
+        self.assertEqual(aaa["revenue_end"], 200.0)
+        self.assertAlmostEqual(aaa["revenue_cagr"], (2 ** (1 / 3) - 1) * 100)
+        self.assertAlmostEqual(aaa["total_cashflow"], 60.0)
+        self.assertAlmostEqual(aaa["debt_ratio_improvement"], 0.2)
+        # A missing first value stays missing rather than skipping ahead.
+        self.assertTrue(np.isnan(aaa["operating_margin_trend"]))
+        self.assertEqual(aaa["performance_class"], "Excellent")
+
+        bbb = table["BBB"]
+        self.assertIsNone(bbb["net_income_cagr"])
+        self.assertEqual(bbb["performance_class"], "Concerning")
+
+
+class FeaturePreprocessingTests(unittest.TestCase):
+    def test_prepare_ml_dataset_leaves_input_untouched(self):
+        df = pd.DataFrame(
+            {
+                "revenue": [1.0, np.inf, 3.0, np.nan],
+                "margin": [0.1, 0.2, -np.inf, 0.4],
+                "constant": [5.0, 5.0, 5.0, 5.0],
+                "sector": ["a", "b", "a", "b"],
+            }
+        )
+        original = df.copy()
+
+        result = prepare_ml_dataset(df, handle_missing="mean")
+        processed = result["processed_data"]
+
+        pd.testing.assert_frame_equal(df, original)
+        self.assertEqual(result["preprocessing_steps"][0]["infinite_values_fixed"], 2)
+        self.assertNotIn("constant", processed.columns)
+        self.assertIn("sector_b", processed.columns)
+        self.assertFalse(np.isinf(processed[["revenue", "margin"]].to_numpy()).any())
+        self.assertFalse(processed[["revenue", "margin"]].isna().any().any())
+
+
+class InsightsTests(unittest.TestCase):
+    def test_anomalies_match_per_company_rules(self):
+        df = _company_frame().assign(
+            profit_margin=[10.0, 17.0, 3.0, -6.25, 6.67],
+            asset_efficiency=[0.8, 0.9, 0.5, 1.1, 1.0],
+            debt_to_asset=[0.5, 0.6, 0.75, 0.3, 0.35],
+        )
+
+        anomalies = detect_anomalies(df, ["AAA", "BBB"])
+
+        self.assertEqual(
+            anomalies,
+            [
+                "AAA (FY 2020): Profit margin dropped -7.00% - investigate profitability decline",
+                "AAA (FY 2021): Profit margin dropped -7.00% - investigate profitability decline",
+                "AAA: Asset efficiency degraded to 0.50x (below historical avg 0.85x)",
+                "AAA: High debt-to-assets ratio (0.75) - potential financial risk",
+                "BBB showed negative net income in 1 years",
+            ],
+        )
+
+
+class OutlierTreatmentTests(unittest.TestCase):
+    def test_fused_pass_matches_individual_detectors(self):
+        rng = np.random.default_rng(7)
+        df = pd.DataFrame(rng.standard_t(2, size=(40, 3)), columns=["a", "b", "c"])
+        df.loc[::6, "b"] = np.nan
+        df.loc[3, "c"] = np.inf
+        df.loc[[5, 9], "a"] = 0.0
+        df["shares"] = rng.integers(0, 5, 40)
+        df["ticker"] = "AAA"
+
+        outliers, extreme_values, anomalies = analyze_columns(df, threshold=1.5, percentile=90)
+
+        expected_outliers = detect_statistical_outliers(df, method="iqr", threshold=1.5)
+        self.assertEqual(outliers.keys(), expected_outliers.keys())
+        for col, result in expected_outliers.items():
+            self.assertEqual(outliers[col]["outlier_count"], result["outlier_count"])
+            self.assertEqual(outliers[col]["outlier_indices"], result["outlier_indices"])
+        self.assertEqual(extreme_values, detect_extreme_values(df, percentile=90))
+        self.assertEqual(anomalies, flag_anomalies(df))
+        self.assertEqual(anomalies["a"]["zero_count"], 2)
+        self.assertEqual(anomalies["c"]["inf_count"], 1)
+        self.assertEqual(anomalies["b"]["nan_count"], 7)
+
+
+class TimeseriesTests(unittest.TestCase):
+    def test_trend_slopes_fit_every_metric_in_one_solve(self):
+        df = pd.DataFrame(
+            {
+                "ticker": "AAA",
+                "date": pd.to_datetime(["2020-12-31", "2021-12-31", "2022-12-31", "2023-12-31"]),
+                "revenue": [3.0, 5.0, 7.0, 9.0],
+                "net_income": [1.0, 1.0, 1.0, 1.0],
+                "profit_margin": [4.0, 1.0, 3.0, 0.0],
+            }
+        )
+
+        slopes = calculate_trend_slope(df)
+
+        self.assertAlmostEqual(slopes["total_revenue"]["slope"], 2.0)
+        self.assertAlmostEqual(slopes["total_revenue"]["intercept"], 3.0)
+        self.assertAlmostEqual(slopes["total_revenue"]["r_squared"], 1.0)
+        # A constant series is a perfect (flat) fit, as sklearn scores it.
+        self.assertEqual(slopes["net_profit"]["slope_interpretation"], "decreasing")
+        self.assertEqual(slopes["net_profit"]["r_squared"], 1.0)
+        self.assertAlmostEqual(slopes["profit_margin"]["slope"], -1.0)
+        self.assertAlmostEqual(slopes["profit_margin"]["r_squared"], 0.5)
+
+    def test_trend_slopes_skip_missing_years(self):
+        df = pd.DataFrame(
+            {
+                "ticker": "AAA",
+                "fiscal_year": [2020, 2021, 2022, 2023],
+                "revenue": [3.0, np.nan, 7.0, 9.0],
+                "net_income": [np.nan, np.nan, np.nan, 1.0],
+            }
+        )
+
+        slopes = calculate_trend_slope(df)
+
+        # The gap is left out of the fit instead of counting as a zero year.
+        self.assertAlmostEqual(slopes["total_revenue"]["slope"], 2.0)
+        self.assertAlmostEqual(slopes["total_revenue"]["intercept"], 3.0)
+        self.assertAlmostEqual(slopes["total_revenue"]["r_squared"], 1.0)
+        self.assertNotIn("net_profit", slopes)
+
+    def test_run_reuses_results_cached_for_identical_input(self):
+        df = pd.DataFrame(
+            {
+                "ticker": "AAA",
+                "fiscal_year": [2020, 2021, 2022, 2023],
+                "revenue": [3.0, 5.0, 7.0, 9.0],
+            }
+        )
+        with tempfile.TemporaryDirectory() as cache_dir, mock.patch.object(
+            timeseries_analysis, "CACHE_DIR", cache_dir
+        ), mock.patch.object(
+            timeseries_analysis, "get_standard_table_data", side_effect=lambda: df.copy()
+        ), mock.patch("builtins.print"):
+            first = timeseries_analysis.run_timeseries_analysis()
+            with mock.patch.object(
+                timeseries_analysis, "calculate_trend_slope", return_value={}
+            ) as slope:
+                second = timeseries_analysis.run_timeseries_analysis()
+                slope.assert_not_called()
+                timeseries_analysis.run_timeseries_analysis(use_cache=False)
+                slope.assert_called_once()
+
+        self.assertEqual(second["trend_slopes"], first["trend_slopes"])
+
+    def test_run_caches_only_complete_results_and_prunes_old_entries(self):
+        df = pd.DataFrame(
+            {
+                "ticker": "AAA",
+                "fiscal_year": [2020, 2021, 2022, 2023],
+                "revenue": [3.0, 5.0, 7.0, 9.0],
+            }
+        )
+        with tempfile.TemporaryDirectory() as cache_dir, mock.patch.object(
+            timeseries_analysis, "CACHE_DIR", cache_dir
+        ), mock.patch("builtins.print"):
+            with mock.patch.object(
+                timeseries_analysis, "detect_seasonality", side_effect=RuntimeError("boom")
+            ):
+                timeseries_analysis.run_timeseries_analysis(data=(df, None, None))
+            self.assertEqual(os.listdir(cache_dir), [])
+
+            timeseries_analysis.run_timeseries_analysis(data=(df, None, None))
+            timeseries_analysis.run_timeseries_analysis(data=(df.assign(revenue=df["revenue"] * 2), None, None))
+            cached = os.listdir(cache_dir)
+
+        self.assertEqual(len(cached), 1)
+        self.assertTrue(cached[0].startswith("ts_analysis_"))
+
+    def test_run_uses_shared_data_instead_of_fetching(self):
+        df = pd.DataFrame(
+            {
+                "ticker": "AAA",
+                "fiscal_year": [2020, 2021, 2022, 2023],
+                "revenue": [3.0, 5.0, 7.0, 9.0],
+            }
+        )
+        with mock.patch.object(timeseries_analysis, "get_standard_table_data") as fetch, mock.patch(
+            "builtins.print"
+        ):
+            results = timeseries_analysis.run_timeseries_analysis(use_cache=False, data=(df, None, None))
+
+        fetch.assert_not_called()
+        self.assertAlmostEqual(results["trend_slopes"]["AAA"]["total_revenue"]["slope"], 2.0)
+
+
+class EtlLoadTests(unittest.TestCase):
+    def test_batch_upsert_sends_every_batch_concurrently(self):
+        client = mock.MagicMock()
+        records = [{"ticker": "AAA", "value": i} for i in range(250)]
+
+        with mock.patch.object(load, "BATCH_SIZE", 100), mock.patch("builtins.print"):
+            load._batch_upsert(client, "standard_table", records, on_conflict="ticker,date,user_id")
+
+        sent = [c.args[0] for c in client.table.return_value.upsert.call_args_list]
+        self.assertEqual(sorted(len(batch) for batch in sent), [50, 100, 100])
+        self.assertEqual(sorted(r["value"] for batch in sent for r in batch), list(range(250)))
+
+    def test_load_streams_staged_csv_through_copy_when_database_url_set(self):
+        psycopg = mock.MagicMock()
+        cursor = psycopg.connect.return_value.__enter__.return_value.cursor.return_value.__enter__.return_value
+        copy = cursor.copy.return_value.__enter__.return_value
+        content = "date,ticker,revenue\n2023-12-31,AAA,10.0\n2024-12-31,AAA,\n"
+
+        with tempfile.TemporaryDirectory() as tmp:
+            staged_path = Path(tmp) / "standard_table.csv"
+            staged_path.write_text(content, encoding="utf-8")
+            with mock.patch.object(load, "psycopg", psycopg), mock.patch.object(
+                load, "sql", mock.MagicMock()
+            ) as sql, mock.patch.object(
+                load, "get_secret", return_value="postgresql://db"
+            ), mock.patch.object(load, "get_supabase_client") as rest, mock.patch("builtins.print"):
+                load.load_to_supabase(str(staged_path), "standard_table")
+
+        psycopg.connect.assert_called_once_with("postgresql://db")
+        self.assertEqual(
+            [c.args[0] for c in sql.Identifier.call_args_list],
+            ["standard_table", "date", "ticker", "revenue"],
+        )
+        self.assertEqual("".join(c.args[0] for c in copy.write.call_args_list), content)
+        rest.assert_not_called()
+
+    def test_supabase_clients_are_created_once_per_process(self):
+        load.get_supabase_client.cache_clear()
+        load.get_supabase_admin_client.cache_clear()
+        self.addCleanup(load.get_supabase_client.cache_clear)
+        self.addCleanup(load.get_supabase_admin_client.cache_clear)
+
+        with mock.patch.object(load, "get_secret", return_value="secret"), mock.patch.object(
+            load, "create_client", side_effect=lambda *args, **kwargs: object()
+        ) as create:
+            self.assertIs(load.get_supabase_client(), load.get_supabase_client())
+            self.assertIs(load.get_supabase_admin_client(), load.get_supabase_admin_client())
+
+        self.assertEqual(create.call_count, 2)
+
+    def test_records_send_missing_and_infinite_values_as_null(self):
+        df = pd.DataFrame(
+            {
+                "ticker": ["AAA", None],
+                "revenue": [np.inf, 2.0],
+                "revenue_growth": [np.nan, -np.inf],
+                "year": [2023, 2024],
+            }
+        )
+
+        self.assertEqual(
+            load._json_records(df),
+            [
+                {"ticker": "AAA", "revenue": None, "revenue_growth": None, "year": 2023},
+                {"ticker": None, "revenue": 2.0, "revenue_growth": None, "year": 2024},
+            ],
+        )
+
+    def test_batch_upsert_raises_batch_errors(self):
+        client = mock.MagicMock()
+        client.table.return_value.upsert.return_value.execute.side_effect = RuntimeError("boom")
+
+        with mock.patch("builtins.print"), self.assertRaises(RuntimeError):
+            load._batch_upsert(client, "standard_table", [{"ticker": "AAA"}])
+
+
+    def test_upserts_ask_postgrest_not_to_return_rows(self):
+        client = mock.MagicMock()
+        client.table.return_value.upsert.return_value.execute.side_effect = RuntimeError(
+            "there is no unique or exclusion constraint matching the ON CONFLICT specification"
+        )
+
+        with mock.patch("builtins.print"):
+            load._upsert_batch(client, "standard_table", [{"ticker": "AAA"}], on_conflict="ticker,date,user_id")
+
+        table = client.table.return_value
+        self.assertEqual(table.upsert.call_args.kwargs["returning"], "minimal")
+        self.assertEqual(table.insert.call_args.kwargs["returning"], "minimal")
+
+
+if __name__ == "__main__":
+    unittest.main()